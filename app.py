@@ -16,9 +16,22 @@ st.set_page_config(
 )
 
 from src.design import set_ios_design, section_title, page_header
+from src.data_access import data_version, get_games, get_match_events
+from src.trends_engine import TrendTracker
 
 set_ios_design()
 
+
+@st.cache_resource
+def trend_tracker():
+    """Moteur de tendances partagé par toutes les sessions (gardé entre deux versions des données)."""
+    return TrendTracker()
+
+
+def load_trends(version):
+    """Tendances du joueur : seuls les nouveaux matchs sont ajoutés quand les données changent."""
+    return trend_tracker().update(get_games(), get_match_events, version)
+
 # ── Shared session state defaults ────────────────────────────────────
 st.session_state.setdefault("sport", DEFAULT_SPORT)
 st.session_state.setdefault("current_game_id", None)
@@ -62,23 +75,31 @@ if page == "👤  Me":
 
     section_title("Progress")
 
+    progress = load_trends(data_version()).player("me").progress()
+    rating = progress["metrics"].get("rating", {})
+    avg_rating = f"{rating['rolling_mean']:.1f}" if rating.get("rolling_mean") is not None else "—"
+    rating_delta = f"{rating['delta']:+.1f}" if rating.get("delta") is not None else ""
+    delta_color = "#FF3B30" if rating_delta.startswith("-") else "#34C759"
+    last_match = progress["last_match"]
+    last_date = f"Last: {str(last_match.date)[:10]}" if last_match is not None and last_match.date else ""
+
     col1, col2 = st.columns(2)
     with col1:
-        st.markdown("""
+        st.markdown(f"""
         <div class="nm-card">
           <div style="font-size:22px;margin-bottom:4px;">⭐</div>
-          <div style="font-size:32px;font-weight:700;color:#1C1C1E;">4.2</div>
+          <div style="font-size:32px;font-weight:700;color:#1C1C1E;">{avg_rating}</div>
           <div style="font-size:13px;color:#8E8E93;">Average Rating</div>
-          <div style="font-size:12px;color:#34C759;margin-top:4px;">+0.3</div>
+          <div style="font-size:12px;color:{delta_color};margin-top:4px;">{rating_delta}</div>
         </div>
         """, unsafe_allow_html=True)
     with col2:
-        st.markdown("""
+        st.markdown(f"""
         <div class="nm-card">
           <div style="font-size:22px;margin-bottom:4px;">🎬</div>
-          <div style="font-size:32px;font-weight:700;color:#1C1C1E;">3</div>
+          <div style="font-size:32px;font-weight:700;color:#1C1C1E;">{progress["games_analyzed"]}</div>
           <div style="font-size:13px;color:#8E8E93;">Games Analyzed</div>
-          <div style="font-size:12px;color:#34C759;margin-top:4px;">+1</div>
+          <div style="font-size:12px;color:#34C759;margin-top:4px;">{last_date}</div>
         </div>
         """, unsafe_allow_html=True)
 
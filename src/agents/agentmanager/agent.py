@@ -4,19 +4,320 @@ from pathlib import Path
 if __name__ == "__main__":
 	sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from src.config import GROQ_API_KEY
-from groq import Groq
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from src.config import (GROQ_CACHE_ENABLED, GROQ_EVENTS_PER_REQUEST, GROQ_MAX_CONCURRENCY, GROQ_OUTPUT_TOKENS_RESERVE,
+						GROQ_TEMPERATURE)
+from src.agents.agentmanager.client_pool import get_client, new_async_client
+from src.agents.agentmanager.json_stream import ArrayItemStreamParser, extract_json_object
+from src.agents.agentmanager.payload import encode_match_data, estimate_tokens, serialize_match_data, token_budget
+from src.agents.agentmanager.prompt_registry import get_prompt_registry
+from src.agents.agentmanager.response_cache import ResponseCache, get_response_cache
+from src.agents.agentmanager.scheduler import BATCH, INTERACTIVE, get_scheduler
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 
 console = Console()
 
+# Consigne ajoutée au prompt quand une requête regroupe plusieurs événements clés
+EVENTS_INSTRUCTION = (
+	"Les données contiennent plusieurs événements clés (liste \"evenements\", chacun avec un \"id\"). "
+	"Produis exactement une entrée de \"recommandations_coach\" par événement, dans le même ordre, "
+	"et recopie l'id de l'événement dans un champ \"id_evenement\" de l'entrée."
+)
+EVENTS_INTRO = "Voici les événements du match"
+
+
+@dataclass
+class CompletionResult:
+	"""Résultat d'une requête d'un lot : result si succès, error sinon (jamais les deux)."""
+	request_id: Any
+	result: Optional[Dict[str, Any]] = None
+	error: Optional[BaseException] = None
+	seconds: float = 0.0
+
+	@property
+	def ok(self) -> bool:
+		return self.error is None
+
 
 class Agent:
+	# Modèle Groq et sport du coach (définis par chaque sous-classe)
+	model: Optional[str] = None
+	sport: Optional[str] = None
+	# File de l'ordonnanceur : interactive (pages) ou BATCH (jobs en arrière-plan)
+	priority: int = INTERACTIVE
+
 	def __init__(self):
-		self.client = Groq(api_key=GROQ_API_KEY)
+		# Client partagé par tout le processus (pool de connexions keep-alive)
+		self.client = get_client()
+
+	@classmethod
+	def for_match(cls, match_data, intro="Voici les données du match", event=None, minute=None):
+		"""
+		Coach prêt pour un match : contexte et prompt issus du registre de prompts du sport.
+		Les données du match sont encodées en JSON compact, réduites aux séquences de
+		l'action sélectionnée (event, minute) et au budget de tokens du modèle.
+		"""
+		prompts = get_prompt_registry().get(cls.sport)
+		budget = token_budget(cls.model) - estimate_tokens(prompts.context) - estimate_tokens(prompts.build_user_prompt("", intro))
+		payload = encode_match_data(match_data, budget, event, minute)
+		return cls(prompts.context, prompts.build_user_prompt(payload, intro))
+
+	@staticmethod
+	def _messages(context, user_prompt):
+		return [
+			{"role": "system", "content": context},
+			{"role": "user", "content": user_prompt},
+		]
+
+	@staticmethod
+	def _reserved_tokens(context, user_prompt):
+		"""Tokens réservés auprès de l'ordonnanceur : prompt estimé + réponse attendue."""
+		return estimate_tokens(context) + estimate_tokens(user_prompt) + GROQ_OUTPUT_TOKENS_RESERVE
+
+	@staticmethod
+	def _parse(response):
+		content = response.choices[0].message.content
+		if content is None:
+			raise ValueError("The model returned an empty response.")
+		# Parsé avant la mise en cache : une réponse invalide n'est jamais servie depuis le cache
+		return content, json.loads(content)
+
+	def complete_json(self, model, context, user_prompt, temperature=GROQ_TEMPERATURE):
+		"""
+		Complétion JSON (message système + message utilisateur) commune à tous les coachs.
+		Les réponses sont mises en cache sur disque : une requête identique (même modèle,
+		température, contexte et prompt) est servie sans appel à l'API.
+		"""
+		cache = get_response_cache() if GROQ_CACHE_ENABLED else None
+		key = ResponseCache.key(model, temperature, context, user_prompt, response_format="json_object")
+		cached = cache.get(key) if cache else None
+		if cached is not None:
+			return json.loads(cached)
+
+		# Via l'ordonnanceur : limites de débit du modèle, nouvelles tentatives, disjoncteur
+		response = get_scheduler().run(model, lambda: self.client.chat.completions.create(
+			messages=self._messages(context, user_prompt),
+			model=model,
+			temperature=temperature,
+			response_format={"type": "json_object"}
+		), self._reserved_tokens(context, user_prompt), self.priority)
+
+		content, result = self._parse(response)
+		if cache:
+			cache.put(key, model, content)
+		return result
+
+	# ── Streaming ────────────────────────────────────────────────────────
+
+	def stream_json(self, model, context, user_prompt, temperature=GROQ_TEMPERATURE) -> Iterator[str]:
+		"""
+		Variante en streaming de complete_json : produit le texte de la réponse au fil
+		des tokens. La réponse complète est validée puis mise en cache sous la même clé
+		que complete_json (une requête déjà faite est rejouée d'un bloc, sans appel).
+		"""
+		cache = get_response_cache() if GROQ_CACHE_ENABLED else None
+		key = ResponseCache.key(model, temperature, context, user_prompt, response_format="json_object")
+		cached = cache.get(key) if cache else None
+		if cached is not None:
+			yield cached
+			return
+
+		# Pas de response_format : le mode JSON de Groq ne se combine pas au streaming,
+		# le format est imposé par le prompt et vérifié en fin de flux
+		# (un échec avant le premier token est retenté par l'ordonnanceur, pas une coupure en cours de flux)
+		stream = get_scheduler().run(model, lambda: self.client.chat.completions.create(
+			messages=self._messages(context, user_prompt),
+			model=model,
+			temperature=temperature,
+			stream=True
+		), self._reserved_tokens(context, user_prompt), self.priority)
+		parts = []
+		for chunk in stream:
+			token = chunk.choices[0].delta.content if chunk.choices else None
+			if token:
+				parts.append(token)
+				yield token
+
+		content = extract_json_object("".join(parts))
+		json.loads(content)
+		if cache:
+			cache.put(key, model, content)
+
+	def stream_items(self, model, context, user_prompt, temperature=GROQ_TEMPERATURE,
+					 key="recommandations_coach") -> Iterator[Dict[str, Any]]:
+		"""Éléments du tableau key de la réponse, chacun produit dès que son objet JSON est complet."""
+		parser = ArrayItemStreamParser(key)
+		for token in self.stream_json(model, context, user_prompt, temperature):
+			yield from parser.feed(token)
+
+	# ── Lots asynchrones ─────────────────────────────────────────────────
 
+	async def acomplete_json(self, client, model, context, user_prompt, temperature=GROQ_TEMPERATURE,
+							 validate: Optional[Callable[[Any], bool]] = None):
+		"""
+		Version asynchrone de complete_json (même cache), avec un client AsyncGroq. Le
+		cache SQLite est lu et écrit dans un thread : un cache verrouillé ne bloque pas
+		la boucle d'événements (ni les autres requêtes du lot). Avec validate, seule une
+		réponse validée est mise en cache ou servie depuis le cache : une réponse
+		rejetée est redemandée à l'API au prochain appel.
+		"""
+		cache = get_response_cache() if GROQ_CACHE_ENABLED else None
+		key = ResponseCache.key(model, temperature, context, user_prompt, response_format="json_object")
+		cached = await asyncio.to_thread(cache.get, key) if cache else None
+		if cached is not None:
+			result = json.loads(cached)
+			if validate is None or validate(result):
+				return result
+
+		response = await get_scheduler().arun(model, lambda: client.chat.completions.create(
+			messages=self._messages(context, user_prompt),
+			model=model,
+			temperature=temperature,
+			response_format={"type": "json_object"}
+		), self._reserved_tokens(context, user_prompt), BATCH)
+
+		content, result = self._parse(response)
+		if cache and (validate is None or validate(result)):
+			await asyncio.to_thread(cache.put, key, model, content)
+		return result
+
+	async def acomplete_batch(self, prompts: Dict[Any, str], context=None, model=None,
+							  temperature=GROQ_TEMPERATURE, concurrency=GROQ_MAX_CONCURRENCY,
+							  validate: Optional[Callable[[Any, Any], bool]] = None) -> AsyncIterator[CompletionResult]:
+		"""
+		Lance les complétions d'un lot ({request_id: prompt utilisateur}) en parallèle, au
+		plus concurrency à la fois, et produit chaque résultat dès qu'il est prêt (ordre
+		d'arrivée). L'échec d'une requête n'interrompt pas les autres : il est renvoyé
+		dans son CompletionResult. validate(request_id, result) : voir acomplete_json.
+		"""
+		context = self.context if context is None else context
+		model = model or self.model
+		semaphore = asyncio.Semaphore(max(1, concurrency))
+
+		async with new_async_client() as client:
+			async def run(request_id, user_prompt):
+				async with semaphore:
+					start = time.perf_counter()
+					try:
+						result = await self.acomplete_json(
+							client, model, context, user_prompt, temperature,
+							(lambda result: validate(request_id, result)) if validate else None)
+					except Exception as e:
+						return CompletionResult(request_id, error=e, seconds=time.perf_counter() - start)
+					return CompletionResult(request_id, result, seconds=time.perf_counter() - start)
+
+			tasks = [asyncio.create_task(run(request_id, prompt)) for request_id, prompt in prompts.items()]
+			try:
+				for next_done in asyncio.as_completed(tasks):
+					yield await next_done
+			finally:
+				for task in tasks:
+					task.cancel()
+
+	def generate_recommendations_batch(self, match_batch: Dict[Any, Any], prompt: str,
+									   concurrency=GROQ_MAX_CONCURRENCY) -> List[CompletionResult]:
+		"""
+		Recommandations pour plusieurs matchs/séquences ({id: match_data}) en un appel
+		bloquant : durée proche de la requête la plus lente, pas de leur somme.
+		"""
+		budget = token_budget(self.model) - estimate_tokens(self.context) - estimate_tokens(f"{prompt}\nVoici les données du match : ")
+		prompts = {request_id: f"{prompt}\nVoici les données du match : {encode_match_data(match_data, budget)}"
+				   for request_id, match_data in match_batch.items()}
+
+		async def collect():
+			return [result async for result in self.acomplete_batch(prompts, concurrency=concurrency)]
+
+		return asyncio.run(collect())
+
+
+	# ── Plusieurs événements par requête ─────────────────────────────────
+
+	@classmethod
+	def for_sport(cls):
+		"""Coach d'un sport sans données de match (contexte et consigne du registre), pour annotate_events."""
+		prompts = get_prompt_registry().get(cls.sport)
+		return cls(prompts.context, prompts.user_prompt)
+
+	def _events_prompt(self, events, player=None):
+		payload = serialize_match_data({"joueur_analyse": player, "evenements": events})
+		return f"{self.user_prompt}\n{EVENTS_INSTRUCTION}\n{EVENTS_INTRO} : {payload}"
+
+	def _pack_events(self, events, player=None, events_per_request=GROQ_EVENTS_PER_REQUEST):
+		"""Lots d'événements : au plus events_per_request par requête, dans le budget de tokens du modèle."""
+		budget = token_budget(self.model) - estimate_tokens(self.context)
+		chunks, chunk = [], []
+		for event in events:
+			too_big = chunk and estimate_tokens(self._events_prompt(chunk + [event], player)) > budget
+			if len(chunk) >= max(1, events_per_request) or too_big:
+				chunks.append(chunk)
+				chunk = []
+			chunk.append(event)
+		if chunk:
+			chunks.append(chunk)
+		return chunks
+
+	@staticmethod
+	def _split_by_event(result, events):
+		"""Entrées de recommandations_coach rattachées à leur événement par id_evenement (entrées invalides ignorées)."""
+		ids = {str(event["id"]) for event in events}
+		entries = {}
+		for entry in (result or {}).get("recommandations_coach") or []:
+			if not isinstance(entry, dict) or not isinstance(entry.get("contenu"), dict):
+				continue
+			event_id = str(entry.get("id_evenement"))
+			contenu = entry["contenu"]
+			if event_id in ids and event_id not in entries and all(contenu.get(field) for field in ("constat", "analyse", "action_corrective")):
+				entries[event_id] = entry
+		return entries
+
+	def annotate_events(self, events: List[Dict[str, Any]], player=None,
+						events_per_request=GROQ_EVENTS_PER_REQUEST,
+						concurrency=GROQ_MAX_CONCURRENCY) -> Dict[Any, CompletionResult]:
+		"""
+		Une recommandation par événement clé (chaque événement a un "id") en quelques
+		requêtes : les événements sont regroupés par lots (events_per_request au plus,
+		dans le budget de tokens), le contexte système n'est envoyé qu'une fois par lot
+		et les lots partent en parallèle. Chaque entrée renvoyée est rattachée à son
+		événement par id_evenement et validée ; les événements restés sans réponse
+		valide sont redemandés une fois, puis renvoyés en erreur. Seules les réponses
+		dont tous les événements sont validés vont dans le cache : la nouvelle demande
+		(et un nouvel appel plus tard) interroge bien l'API.
+		"""
+		results: Dict[Any, CompletionResult] = {}
+		pending = list(events)
+		for _ in range(2):
+			chunks = self._pack_events(pending, player, events_per_request)
+			prompts = {index: self._events_prompt(chunk, player) for index, chunk in enumerate(chunks)}
+
+			def complete(request_id, result):
+				return len(self._split_by_event(result, chunks[request_id])) == len(chunks[request_id])
+
+			async def collect():
+				return [result async for result in self.acomplete_batch(prompts, concurrency=concurrency, validate=complete)]
+
+			pending = []
+			for completion in asyncio.run(collect()):
+				chunk = chunks[completion.request_id]
+				entries = self._split_by_event(completion.result, chunk) if completion.ok else {}
+				for event in chunk:
+					entry = entries.get(str(event["id"]))
+					if entry is not None:
+						results[event["id"]] = CompletionResult(event["id"], entry, seconds=completion.seconds)
+					else:
+						error = completion.error or ValueError(f"Aucune recommandation valide pour l'événement {event['id']}")
+						results[event["id"]] = CompletionResult(event["id"], error=error, seconds=completion.seconds)
+						pending.append(event)
+			if not pending:
+				break
+
+		return {event["id"]: results[event["id"]] for event in events}
 
 	@staticmethod
 	def read_file(file_path):
@@ -43,4 +344,16 @@ class Agent:
 			if c.get("pro_tip"):
 				table.add_row("🌟 [bold blue]Pro-Tip[/bold blue]", f"[blue]{c['pro_tip']}[/blue]")
 
-			console.print(table)
\ No newline at end of file
+			console.print(table)
+
+
+def coach_class(sport):
+	"""Classe du coach d'un sport (pickleball par défaut)."""
+	if sport == "football":
+		from src.agents.agentfootball.agent_recommendation_football import FootballCoachAI
+		return FootballCoachAI
+	if sport == "padel":
+		from src.agents.agentpadel.agent_recommendation_padel import PadelCoachAI
+		return PadelCoachAI
+	from src.agents.agentpickelball.agent_recommendation_pickelball import PickelballCoachAI
+	return PickelballCoachAI
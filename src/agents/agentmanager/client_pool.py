@@ -0,0 +1,158 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from groq import AsyncGroq, DefaultAsyncHttpxClient, DefaultHttpxClient, Groq
+
+from src.config import (GROQ_API_KEY, GROQ_CONNECT_TIMEOUT_SECONDS, GROQ_KEEPALIVE_SECONDS,
+						GROQ_POOL_MAX_CONNECTIONS, GROQ_POOL_MAX_KEEPALIVE, GROQ_TIMEOUT_SECONDS)
+
+
+# ── Instrumentation ──────────────────────────────────────────────────
+
+ConnectionListener = Callable[[Dict[str, Any]], None]
+
+_listeners: List[ConnectionListener] = []
+_stats = {"requests": 0, "new_connections": 0, "reused_connections": 0, "tls_handshakes": 0}
+_stats_lock = threading.Lock()
+
+
+class _RequestTrace:
+	"""
+	Callback de l'extension "trace" de httpcore pour une requête : note si une
+	connexion TCP/TLS a été ouverte (requête froide) ou si une connexion du pool
+	a été réutilisée (requête chaude), et la durée de ces étapes.
+	"""
+
+	def __init__(self, url: str):
+		self.url = url
+		self.connected = False
+		self.tls = False
+		self.connect_ms = 0.0
+		self.tls_ms = 0.0
+		self._started: Dict[str, float] = {}
+
+	def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+		step, _, phase = event_name.rpartition(".")
+		if phase == "started":
+			self._started[step] = time.perf_counter()
+		elif phase == "complete":
+			elapsed = (time.perf_counter() - self._started.pop(step, time.perf_counter())) * 1000
+			if step == "connection.connect_tcp":
+				self.connected = True
+				self.connect_ms = elapsed
+			elif step == "connection.start_tls":
+				self.tls = True
+				self.tls_ms = elapsed
+
+	async def atrace(self, event_name: str, info: Dict[str, Any]) -> None:
+		self(event_name, info)
+
+
+def _on_request(request: httpx.Request) -> None:
+	trace = _RequestTrace(str(request.url))
+	request.extensions["trace"] = trace
+	request.extensions["nextmove_trace"] = trace
+
+
+def _on_response(response: httpx.Response) -> None:
+	trace: Optional[_RequestTrace] = response.request.extensions.get("nextmove_trace")
+	if trace is None:
+		return
+	event = {
+		"url": trace.url,
+		"reused": not trace.connected,
+		"connect_ms": round(trace.connect_ms, 1),
+		"tls_ms": round(trace.tls_ms, 1),
+		"status_code": response.status_code,
+	}
+	with _stats_lock:
+		_stats["requests"] += 1
+		_stats["reused_connections" if event["reused"] else "new_connections"] += 1
+		_stats["tls_handshakes"] += int(trace.tls)
+	for listener in list(_listeners):
+		listener(event)
+
+
+async def _aon_request(request: httpx.Request) -> None:
+	_on_request(request)
+	request.extensions["trace"] = request.extensions["nextmove_trace"].atrace
+
+
+async def _aon_response(response: httpx.Response) -> None:
+	_on_response(response)
+
+
+def add_connection_listener(listener: ConnectionListener) -> None:
+	"""Appelle listener(event) après chaque requête Groq : url, reused, connect_ms, tls_ms, status_code."""
+	_listeners.append(listener)
+
+
+def remove_connection_listener(listener: ConnectionListener) -> None:
+	if listener in _listeners:
+		_listeners.remove(listener)
+
+
+def connection_stats() -> Dict[str, int]:
+	"""Compteurs du processus : requêtes, connexions ouvertes / réutilisées, handshakes TLS."""
+	with _stats_lock:
+		return dict(_stats)
+
+
+# ── Clients ──────────────────────────────────────────────────────────
+
+def _limits() -> httpx.Limits:
+	return httpx.Limits(
+		max_connections=GROQ_POOL_MAX_CONNECTIONS,
+		max_keepalive_connections=GROQ_POOL_MAX_KEEPALIVE,
+		keepalive_expiry=GROQ_KEEPALIVE_SECONDS,
+	)
+
+
+def _timeout() -> httpx.Timeout:
+	return httpx.Timeout(GROQ_TIMEOUT_SECONDS, connect=GROQ_CONNECT_TIMEOUT_SECONDS)
+
+
+_client: Optional[Groq] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> Groq:
+	"""
+	Client Groq unique du processus, partagé par tous les coachs et toutes les sessions
+	Streamlit : son pool de connexions keep-alive évite une connexion TCP + TLS par rapport.
+	"""
+	global _client
+	with _client_lock:
+		if _client is None:
+			_client = Groq(
+				api_key=GROQ_API_KEY,
+				timeout=_timeout(),
+				# Nouvelles tentatives gérées par l'ordonnanceur (scheduler.py), pas par le SDK
+				max_retries=0,
+				http_client=DefaultHttpxClient(
+					limits=_limits(),
+					timeout=_timeout(),
+					event_hooks={"request": [_on_request], "response": [_on_response]},
+				),
+			)
+		return _client
+
+
+def new_async_client() -> AsyncGroq:
+	"""
+	Client AsyncGroq avec la même configuration de pool et la même instrumentation.
+	Un client asynchrone est lié à sa boucle d'événements : un par lot (async with),
+	ses connexions sont réutilisées entre les requêtes du lot.
+	"""
+	return AsyncGroq(
+		api_key=GROQ_API_KEY,
+		timeout=_timeout(),
+		max_retries=0,
+		http_client=DefaultAsyncHttpxClient(
+			limits=_limits(),
+			timeout=_timeout(),
+			event_hooks={"request": [_aon_request], "response": [_aon_response]},
+		),
+	)
@@ -0,0 +1,71 @@
+import json
+from typing import Any, Dict, List, Optional
+
+
+class ArrayItemStreamParser:
+	"""
+	Parseur JSON incrémental : alimenté morceau par morceau (tokens d'une complétion
+	en streaming), il renvoie chaque élément du tableau `key` (ex. "recommandations_coach")
+	dès que son accolade fermante arrive, sans attendre la fin du document. Chaque
+	caractère n'est examiné qu'une fois ; le texte hors JSON (ex. balises ```json) est ignoré.
+	"""
+
+	def __init__(self, key: str = "recommandations_coach"):
+		self.key = key
+		self.buffer = ""
+		self.pos = 0
+		self.depth = 0
+		self.in_string = False
+		self.escape = False
+		self.string_start = 0
+		self.last_string: Optional[str] = None
+		self.pending_key: Optional[str] = None
+		self.array_depth: Optional[int] = None
+		self.item_start: Optional[int] = None
+
+	def feed(self, chunk: str) -> List[Dict[str, Any]]:
+		"""Ajoute un morceau de texte ; retourne les éléments complétés par ce morceau."""
+		self.buffer += chunk
+		items = []
+		while self.pos < len(self.buffer):
+			char = self.buffer[self.pos]
+			if self.in_string:
+				if self.escape:
+					self.escape = False
+				elif char == "\\":
+					self.escape = True
+				elif char == '"':
+					self.in_string = False
+					self.last_string = self.buffer[self.string_start:self.pos + 1]
+			elif char == '"':
+				self.in_string = True
+				self.string_start = self.pos
+			elif char == ":":
+				# Clé d'un membre de l'objet racine
+				self.pending_key = json.loads(self.last_string) if self.depth == 1 and self.last_string else None
+			elif char in "{[":
+				if char == "[" and self.array_depth is None and self.pending_key == self.key:
+					self.array_depth = self.depth + 1
+				elif char == "{" and self.array_depth is not None and self.depth == self.array_depth:
+					self.item_start = self.pos
+				self.depth += 1
+				self.pending_key = None
+			elif char in "}]":
+				self.depth -= 1
+				if char == "}" and self.item_start is not None and self.depth == self.array_depth:
+					items.append(json.loads(self.buffer[self.item_start:self.pos + 1]))
+					self.item_start = None
+				elif char == "]" and self.array_depth is not None and self.depth == self.array_depth - 1:
+					self.array_depth = None
+			elif char == ",":
+				self.pending_key = None
+			self.pos += 1
+		return items
+
+
+def extract_json_object(text: str) -> str:
+	"""Objet JSON d'une réponse, débarrassé d'un éventuel texte autour (ex. balises ```json)."""
+	start, end = text.find("{"), text.rfind("}")
+	if start < 0 or end < start:
+		raise ValueError("The model returned no JSON object.")
+	return text[start:end + 1]
@@ -0,0 +1,123 @@
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional
+import pandas as pd
+
+from src.config import GROQ_INPUT_TOKEN_BUDGET, GROQ_MODEL_TOKEN_BUDGETS
+
+
+# Mots et signes isolés, comme les découpe grossièrement un tokenizer BPE
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+	"""
+	Estimation locale du nombre de tokens, sans le tokenizer du modèle : un token par
+	tranche de 4 caractères d'un mot, un par signe de ponctuation. Un peu pessimiste
+	sur du français et du JSON, ce qui laisse une marge sous le budget.
+	"""
+	return sum(-(-len(token) // 4) for token in _TOKEN_PATTERN.findall(text))
+
+
+def token_budget(model: Optional[str]) -> int:
+	"""Budget de tokens d'entrée d'une requête (contexte + prompt + données) pour un modèle."""
+	return GROQ_MODEL_TOKEN_BUDGETS.get(model, GROQ_INPUT_TOKEN_BUDGET)
+
+
+def _compact(value: Any) -> Any:
+	"""Retire récursivement les valeurs nulles et les objets/listes vides."""
+	if isinstance(value, dict):
+		items = ((key, _compact(item)) for key, item in value.items())
+		return {key: item for key, item in items if item is not None and item != {} and item != []}
+	if isinstance(value, (list, tuple)):
+		return [_compact(item) for item in value]
+	return value
+
+
+def _json_default(value: Any) -> Any:
+	# Scalaires numpy (résumés de patterns) -> types Python
+	return value.item() if hasattr(value, "item") else str(value)
+
+
+def serialize_match_data(match_data: Any) -> str:
+	"""
+	Encodage JSON minimal et déterministe des données d'un match : sans espaces, clés
+	triées, valeurs nulles ou vides retirées. Deux payloads égaux donnent le même texte
+	(donc la même clé dans le cache des réponses).
+	"""
+	return json.dumps(_compact(match_data), ensure_ascii=False, separators=(",", ":"),
+					  sort_keys=True, default=_json_default)
+
+
+def _sequence_minute(sequence: Dict[str, Any]) -> Optional[float]:
+	"""Minute de début d'une séquence ("mm:ss" dans timestamp_debut ou timestamp)."""
+	timestamp = sequence.get("timestamp_debut") or sequence.get("timestamp")
+	try:
+		minutes, _, seconds = str(timestamp).partition(":")
+		return int(minutes) + int(seconds or 0) / 60
+	except ValueError:
+		return None
+
+
+def relevant_sequences(sequences: List[Dict[str, Any]], event: Optional[str] = None,
+					   minute: Optional[float] = None) -> List[int]:
+	"""
+	Indices des séquences classées de la plus à la moins pertinente : même événement
+	clé que event d'abord, puis les plus proches de minute, puis l'ordre du match.
+	"""
+	def rank(index: int):
+		sequence = sequences[index]
+		start = _sequence_minute(sequence)
+		distance = abs(start - minute) if minute is not None and start is not None else 0.0
+		return (event is not None and sequence.get("evenement_cle") != event, distance, index)
+
+	return sorted(range(len(sequences)), key=rank)
+
+
+def encode_match_data(match_data: Dict[str, Any], budget: Optional[int] = None,
+					  event: Optional[str] = None, minute: Optional[float] = None) -> str:
+	"""
+	Payload des données du match pour le prompt, dans la limite de budget tokens.
+	Avec event, seules les séquences de cet événement sont gardées (toutes si aucune
+	ne correspond) ; les moins pertinentes sont ensuite retirées tant que le budget est
+	dépassé. ValueError si une seule séquence ne tient toujours pas dans le budget.
+	"""
+	sequences = list(match_data.get("donnees_sequences") or [])
+	order = relevant_sequences(sequences, event, minute)
+	if event is not None and sequences and sequences[order[0]].get("evenement_cle") == event:
+		order = [index for index in order if sequences[index].get("evenement_cle") == event]
+
+	while True:
+		# Séquences gardées dans l'ordre chronologique du match
+		kept = [sequences[index] for index in sorted(order)]
+		payload = serialize_match_data({**match_data, "donnees_sequences": kept} if sequences else match_data)
+		if budget is None or estimate_tokens(payload) <= budget:
+			return payload
+		if len(order) <= 1:
+			raise ValueError(f"Données du match trop volumineuses pour le budget de {budget} tokens "
+							 f"({estimate_tokens(payload)} estimés)")
+		order = order[:-1]
+
+
+def key_events(match_events: pd.DataFrame, types: Iterable[str] = ("ERROR",)) -> List[Dict[str, Any]]:
+	"""
+	Événements clés d'un match (events des types donnés), dans l'ordre des minutes,
+	au format des payloads : id stable = rang de l'event dans le match.
+	"""
+	events = match_events.reset_index(drop=True)
+	events = events[events["type"].astype(str).isin(list(types))].sort_values("minute", kind="stable")
+	def number(value: Any) -> Optional[float]:
+		# Valeur manquante (NaN) -> None, retiré du payload par serialize_match_data
+		return None if pd.isna(value) else round(float(value), 1)
+
+	return [
+		{
+			"id": f"evt_{index}",
+			"minute": None if pd.isna(row["minute"]) else int(row["minute"]),
+			"type": str(row["type"]),
+			"phase": row["phase"] if isinstance(row["phase"], str) else None,
+			"x": number(row["x"]),
+			"y": number(row["y"]),
+		}
+		for index, row in events.iterrows()
+	]
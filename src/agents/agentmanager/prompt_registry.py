@@ -0,0 +1,166 @@
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from src.agents.agentmanager.payload import estimate_tokens, serialize_match_data
+from src.config import PROMPT_PATHS
+
+
+# Suffixe des fichiers de chaque sport (le dossier pickleball garde son orthographe historique)
+FILE_SUFFIXES = {"pickleball": "pickelball", "football": "football", "padel": "padel"}
+
+
+def _freeze(value: Any) -> Any:
+	"""Copie en lecture seule d'une structure JSON (dict -> mappingproxy, list -> tuple)."""
+	if isinstance(value, dict):
+		return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+	if isinstance(value, list):
+		return tuple(_freeze(item) for item in value)
+	return value
+
+
+def _thaw(value: Any) -> Any:
+	"""Copie modifiable d'une structure figée par _freeze."""
+	if isinstance(value, Mapping):
+		return {key: _thaw(item) for key, item in value.items()}
+	if isinstance(value, tuple):
+		return [_thaw(item) for item in value]
+	return value
+
+
+@dataclass(frozen=True)
+class PromptSet:
+	"""Prompts d'un sport : contexte système, consigne utilisateur et exemple de données de match."""
+	sport: str
+	context: str
+	user_prompt: str
+	example: Mapping[str, Any]
+
+	def match_data(self) -> Dict[str, Any]:
+		"""Copie modifiable de l'exemple de données de match (l'original reste intact)."""
+		return _thaw(self.example)
+
+	def build_user_prompt(self, payload: str, intro: str = "Voici les données du match") -> str:
+		"""Prompt utilisateur complet : consigne du sport suivie des données du match encodées (payload)."""
+		return f"{self.user_prompt}\n{intro} : {payload}"
+
+	def sizes(self) -> Dict[str, int]:
+		"""Taille en caractères de chaque partie du prompt (exemple de match encodé comme dans les requêtes)."""
+		return {
+			"context": len(self.context),
+			"user_prompt": len(self.user_prompt),
+			"example": len(serialize_match_data(self.example)),
+		}
+
+	def tokens(self) -> Dict[str, int]:
+		"""Taille estimée en tokens de chaque partie du prompt."""
+		return {
+			"context": estimate_tokens(self.context),
+			"user_prompt": estimate_tokens(self.user_prompt),
+			"example": estimate_tokens(serialize_match_data(self.example)),
+		}
+
+
+def _paths(sport: str) -> Dict[str, Path]:
+	directory, suffix = PROMPT_PATHS[sport], FILE_SUFFIXES[sport]
+	return {
+		"context": directory / f"context_{suffix}.txt",
+		"user_prompt": directory / f"user_prompt_{suffix}.txt",
+		"example": directory / "example_entry.json",
+	}
+
+
+def _signature(paths: Dict[str, Path]) -> Tuple:
+	return tuple((path.stat().st_mtime_ns, path.stat().st_size) for path in paths.values())
+
+
+def load_prompt_set(sport: str) -> PromptSet:
+	"""Lit et valide les prompts d'un sport ; ValueError si un fichier est vide ou mal formé."""
+	paths = _paths(sport)
+	context = paths["context"].read_text(encoding="utf-8")
+	user_prompt = paths["user_prompt"].read_text(encoding="utf-8")
+	example = json.loads(paths["example"].read_text(encoding="utf-8"))
+
+	if not context.strip():
+		raise ValueError(f"Contexte vide : {paths['context']}")
+	if not user_prompt.strip():
+		raise ValueError(f"Prompt utilisateur vide : {paths['user_prompt']}")
+	if not isinstance(example.get("joueur_analyse"), dict) or "nom" not in example["joueur_analyse"]:
+		raise ValueError(f"joueur_analyse.nom manquant : {paths['example']}")
+	if not isinstance(example.get("donnees_sequences"), list) or not example["donnees_sequences"]:
+		raise ValueError(f"donnees_sequences vide ou manquant : {paths['example']}")
+	return PromptSet(sport, context, user_prompt, _freeze(example))
+
+
+class PromptRegistry:
+	"""
+	Prompts de tous les sports, chargés et validés une fois par processus puis gardés
+	en mémoire (lecture seule). Chaque accès compare la date et la taille des fichiers :
+	un prompt modifié sur disque est rechargé, sans redémarrer l'application. Si la
+	nouvelle version est invalide, la précédente reste servie.
+	"""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._entries: Dict[str, Tuple[Tuple, PromptSet]] = {}
+		self._failed: Dict[str, Tuple] = {}
+
+	def get(self, sport: str) -> PromptSet:
+		sport = sport.lower()
+		if sport not in PROMPT_PATHS:
+			raise KeyError(f"Sport inconnu : {sport}")
+		try:
+			signature = _signature(_paths(sport))
+		except OSError:
+			signature = None
+		cached = self._entries.get(sport)
+		if cached is not None and cached[0] == signature:
+			return cached[1]
+
+		with self._lock:
+			cached = self._entries.get(sport)
+			if cached is not None and (cached[0] == signature or self._failed.get(sport) == signature):
+				return cached[1]
+			try:
+				prompts = load_prompt_set(sport)
+			except (OSError, ValueError):
+				# Fichier en cours d'édition : on garde la dernière version valide
+				if cached is None:
+					raise
+				self._failed[sport] = signature
+				return cached[1]
+			self._entries[sport] = (signature, prompts)
+			self._failed.pop(sport, None)
+			return prompts
+
+	def sizes(self) -> Dict[str, Dict[str, int]]:
+		"""Taille des prompts de chaque sport (caractères), pour suivre leur poids dans les requêtes."""
+		return {sport: self.get(sport).sizes() for sport in PROMPT_PATHS}
+
+	def tokens(self) -> Dict[str, Dict[str, int]]:
+		"""Taille estimée en tokens des prompts de chaque sport."""
+		return {sport: self.get(sport).tokens() for sport in PROMPT_PATHS}
+
+
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_prompt_registry() -> PromptRegistry:
+	"""Registre de prompts du processus (créé au premier appel)."""
+	global _registry
+	with _registry_lock:
+		if _registry is None:
+			_registry = PromptRegistry()
+		return _registry
+
+
+if __name__ == "__main__":
+	# python -m src.agents.agentmanager.prompt_registry : taille des prompts par sport (caractères / tokens estimés)
+	registry = get_prompt_registry()
+	tokens = registry.tokens()
+	for sport, sizes in registry.sizes().items():
+		print(f"{sport:<12}" + "  ".join(f"{name}={size}/{tokens[sport][name]}" for name, size in sizes.items()))
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from src.config import GROQ_CACHE_MAX_ENTRIES, GROQ_CACHE_PATH, GROQ_CACHE_TTL_SECONDS
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+	key         TEXT PRIMARY KEY,
+	model       TEXT NOT NULL,
+	content     TEXT NOT NULL,
+	created_at  REAL NOT NULL,
+	accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at);
+CREATE TABLE IF NOT EXISTS stats (
+	name  TEXT PRIMARY KEY,
+	value INTEGER NOT NULL
+);
+"""
+
+
+class ResponseCache:
+	"""
+	Cache disque (SQLite) des réponses Groq, partagé par tous les coachs et tous les
+	processus (pages, workers). Clé = empreinte du modèle, de la température, du
+	contexte système et du prompt utilisateur. Les entrées expirent après ttl secondes
+	et les moins récemment lues sont évincées au-delà de max_entries (LRU).
+	"""
+
+	def __init__(self, path: Path = GROQ_CACHE_PATH, max_entries: int = GROQ_CACHE_MAX_ENTRIES,
+				 ttl: float = GROQ_CACHE_TTL_SECONDS):
+		self.path = Path(path)
+		self.max_entries = max_entries
+		self.ttl = ttl
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		with self._connect() as conn:
+			conn.executescript(SCHEMA)
+
+	@contextmanager
+	def _connect(self) -> Iterator[sqlite3.Connection]:
+		conn = sqlite3.connect(self.path, timeout=30)
+		try:
+			with conn:
+				yield conn
+		finally:
+			conn.close()
+
+	@staticmethod
+	def key(model: str, temperature: float, context: str, user_prompt: str, **params) -> str:
+		payload = json.dumps([model, float(temperature), context, user_prompt, params], ensure_ascii=False, sort_keys=True)
+		return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+	def get(self, key: str) -> Optional[str]:
+		"""Réponse en cache (None si absente ou expirée) ; met à jour les compteurs."""
+		now = time.time()
+		with self._connect() as conn:
+			row = conn.execute("SELECT content, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+			if row is not None and now - row[1] > self.ttl:
+				conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+				row = None
+			if row is not None:
+				conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+			self._count(conn, "hits" if row is not None else "misses")
+		return row[0] if row is not None else None
+
+	def put(self, key: str, model: str, content: str) -> None:
+		now = time.time()
+		with self._connect() as conn:
+			conn.execute("INSERT OR REPLACE INTO responses (key, model, content, created_at, accessed_at) "
+						 "VALUES (?, ?, ?, ?, ?)", (key, model, content, now, now))
+			conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+			# Éviction LRU : on ne garde que les max_entries entrées lues le plus récemment
+			evicted = conn.execute(
+				"DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at DESC "
+				"LIMIT -1 OFFSET ?)", (self.max_entries,),
+			).rowcount
+			if evicted > 0:
+				self._count(conn, "evictions", evicted)
+
+	@staticmethod
+	def _count(conn: sqlite3.Connection, name: str, n: int = 1) -> None:
+		conn.execute("INSERT INTO stats (name, value) VALUES (?, ?) "
+					 "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value", (name, n))
+
+	def stats(self) -> Dict[str, int]:
+		"""Compteurs (hits, misses, evictions) et nombre d'entrées."""
+		with self._connect() as conn:
+			stats = {"hits": 0, "misses": 0, "evictions": 0}
+			stats.update(dict(conn.execute("SELECT name, value FROM stats").fetchall()))
+			stats["entries"] = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+		return stats
+
+	def clear(self) -> None:
+		with self._connect() as conn:
+			conn.execute("DELETE FROM responses")
+			conn.execute("DELETE FROM stats")
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+	"""Instance de cache du processus (créée au premier appel)."""
+	global _cache
+	with _cache_lock:
+		if _cache is None:
+			_cache = ResponseCache()
+		return _cache
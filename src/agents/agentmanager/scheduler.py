@@ -0,0 +1,342 @@
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import groq
+
+from src.config import (
+	GROQ_BACKOFF_BASE_SECONDS,
+	GROQ_BACKOFF_MAX_SECONDS,
+	GROQ_BREAKER_COOLDOWN_SECONDS,
+	GROQ_BREAKER_FAILURES,
+	GROQ_MAX_RETRIES,
+	GROQ_MODEL_RATE_LIMITS,
+	GROQ_REQUESTS_PER_MINUTE,
+	GROQ_TOKENS_PER_MINUTE,
+)
+
+T = TypeVar("T")
+
+# Files de priorité : les requêtes interactives (pages) passent avant les lots (annotations, jobs)
+INTERACTIVE = 0
+BATCH = 1
+LANES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+# Attente maximale entre deux vérifications d'un ticket en file
+POLL_SECONDS = 0.25
+
+
+class CircuitOpenError(RuntimeError):
+	"""Disjoncteur ouvert : le modèle a trop échoué récemment, la requête est refusée sans appel."""
+
+
+class TokenBucket:
+	"""Seau à jetons : au plus per_minute jetons, remplis en continu au rythme de per_minute par minute."""
+
+	def __init__(self, per_minute: float):
+		self.capacity = float(per_minute)
+		self.rate = self.capacity / 60.0
+		self.tokens = self.capacity
+		self.updated = time.monotonic()
+
+	def _refill(self, now: float) -> None:
+		self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+		self.updated = now
+
+	def wait_time(self, amount: float, now: float) -> float:
+		"""Secondes avant que amount jetons soient disponibles (0 = tout de suite)."""
+		self._refill(now)
+		# Une demande plus grosse que le seau attend qu'il soit plein, sans bloquer indéfiniment
+		amount = min(amount, self.capacity)
+		return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+	def take(self, amount: float) -> None:
+		self.tokens -= min(amount, self.capacity)
+
+	def adjust(self, amount: float) -> None:
+		"""Corrige une réservation (positif = jetons rendus, négatif = dette sur les prochaines requêtes)."""
+		self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class CircuitBreaker:
+	"""
+	Disjoncteur d'un modèle : après failures échecs consécutifs (réseau, délai, 5xx), il
+	s'ouvre et refuse les requêtes pendant cooldown secondes, puis laisse passer une
+	seule requête d'essai (semi-ouvert) : un succès le referme, un échec le rouvre.
+	"""
+
+	def __init__(self, failures: int = GROQ_BREAKER_FAILURES, cooldown: float = GROQ_BREAKER_COOLDOWN_SECONDS):
+		self.threshold = max(1, failures)
+		self.cooldown = cooldown
+		self.failures = 0
+		self.opened_at: Optional[float] = None
+		self.trial = False
+
+	def state(self, now: float) -> str:
+		if self.opened_at is None:
+			return "closed"
+		return "open" if now - self.opened_at < self.cooldown else "half_open"
+
+	def remaining(self, now: float) -> float:
+		return max(0.0, self.opened_at + self.cooldown - now) if self.opened_at is not None else 0.0
+
+	def record_success(self) -> None:
+		self.failures = 0
+		self.opened_at = None
+		self.trial = False
+
+	def record_failure(self, now: float) -> None:
+		self.failures += 1
+		if self.trial or self.failures >= self.threshold:
+			self.opened_at = now
+		self.trial = False
+
+
+@dataclass
+class _ModelState:
+	requests: TokenBucket
+	tokens: TokenBucket
+	breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+	queue: List[Tuple[int, int]] = field(default_factory=list)
+	blocked_until: float = 0.0
+	in_flight: int = 0
+
+
+def _status(error: BaseException) -> Optional[int]:
+	return getattr(error, "status_code", None)
+
+
+def _is_transient(error: BaseException) -> bool:
+	"""Panne côté service (réseau, délai dépassé, 5xx) : compte pour le disjoncteur."""
+	status = _status(error)
+	return isinstance(error, groq.APIConnectionError) or (status is not None and status >= 500)
+
+
+def _is_retryable(error: BaseException) -> bool:
+	return _is_transient(error) or _status(error) in (408, 409, 429)
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+	"""Délai demandé par le serveur (en-têtes retry-after-ms / retry-after, en secondes ou date HTTP)."""
+	response = getattr(error, "response", None)
+	headers = getattr(response, "headers", None) or {}
+	try:
+		if headers.get("retry-after-ms"):
+			return float(headers["retry-after-ms"]) / 1000
+		value = headers.get("retry-after")
+		if not value:
+			return None
+		try:
+			return float(value)
+		except ValueError:
+			return (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+	except (TypeError, ValueError):
+		return None
+
+
+def _usage(response: Any) -> Optional[int]:
+	usage = getattr(response, "usage", None)
+	return getattr(usage, "total_tokens", None)
+
+
+class RequestScheduler:
+	"""
+	Ordonnanceur des requêtes Groq du processus. Pour chaque modèle : deux seaux à jetons
+	(requêtes et tokens par minute), une file par priorité (interactive avant lot, puis
+	ordre d'arrivée), des nouvelles tentatives avec backoff exponentiel aléatoire qui
+	respectent retry-after (un 429 met en pause tout le modèle) et un disjoncteur.
+	"""
+
+	def __init__(self, limits: Optional[Dict[str, Tuple[int, int]]] = None,
+				 max_retries: int = GROQ_MAX_RETRIES, backoff_base: float = GROQ_BACKOFF_BASE_SECONDS,
+				 backoff_max: float = GROQ_BACKOFF_MAX_SECONDS):
+		self.limits = GROQ_MODEL_RATE_LIMITS if limits is None else limits
+		self.max_retries = max_retries
+		self.backoff_base = backoff_base
+		self.backoff_max = backoff_max
+		self._lock = threading.Condition()
+		self._models: Dict[str, _ModelState] = {}
+		self._sequence = itertools.count()
+		self.counters = {"requests": 0, "retries": 0, "rate_limited": 0, "failures": 0, "rejected": 0}
+
+	def _state(self, model: str) -> _ModelState:
+		state = self._models.get(model)
+		if state is None:
+			rpm, tpm = self.limits.get(model, (GROQ_REQUESTS_PER_MINUTE, GROQ_TOKENS_PER_MINUTE))
+			state = self._models[model] = _ModelState(TokenBucket(rpm), TokenBucket(tpm))
+		return state
+
+	# ── File d'attente ───────────────────────────────────────────────────
+
+	def _try_acquire(self, model: str, state: _ModelState, ticket: Tuple[int, int], tokens: int) -> float:
+		"""Sous verrou : 0 si le ticket passe (jetons consommés), sinon secondes d'attente."""
+		now = time.monotonic()
+		breaker = state.breaker.state(now)
+		if breaker == "open":
+			self.counters["rejected"] += 1
+			raise CircuitOpenError(f"Service Groq indisponible pour {model} (disjoncteur ouvert), "
+								   f"nouvel essai possible dans {state.breaker.remaining(now):.0f} s")
+		if state.queue[0] != ticket:
+			return POLL_SECONDS
+		# Semi-ouvert : une seule requête d'essai à la fois
+		if breaker == "half_open" and state.breaker.trial:
+			return POLL_SECONDS
+		wait = max(state.blocked_until - now, state.requests.wait_time(1, now), state.tokens.wait_time(tokens, now))
+		if wait > 0:
+			return wait
+
+		state.requests.take(1)
+		state.tokens.take(tokens)
+		heapq.heappop(state.queue)
+		state.breaker.trial = breaker == "half_open"
+		state.in_flight += 1
+		self.counters["requests"] += 1
+		self._lock.notify_all()
+		return 0.0
+
+	def _leave(self, state: _ModelState, ticket: Tuple[int, int]) -> None:
+		if ticket in state.queue:
+			state.queue.remove(ticket)
+			heapq.heapify(state.queue)
+			self._lock.notify_all()
+
+	def acquire(self, model: str, tokens: int, priority: int = INTERACTIVE) -> None:
+		"""Attend le tour de la requête (priorité, limites du modèle) ; CircuitOpenError si le disjoncteur est ouvert."""
+		ticket = (priority, next(self._sequence))
+		with self._lock:
+			state = self._state(model)
+			heapq.heappush(state.queue, ticket)
+			try:
+				while (wait := self._try_acquire(model, state, ticket, tokens)) > 0:
+					self._lock.wait(min(wait, POLL_SECONDS))
+			except BaseException:
+				self._leave(state, ticket)
+				raise
+
+	async def aacquire(self, model: str, tokens: int, priority: int = INTERACTIVE) -> None:
+		"""Version asynchrone de acquire (n'immobilise pas la boucle d'événements)."""
+		ticket = (priority, next(self._sequence))
+		with self._lock:
+			state = self._state(model)
+			heapq.heappush(state.queue, ticket)
+		try:
+			while True:
+				with self._lock:
+					wait = self._try_acquire(model, state, ticket, tokens)
+				if wait <= 0:
+					return
+				await asyncio.sleep(min(wait, POLL_SECONDS))
+		except BaseException:
+			with self._lock:
+				self._leave(state, ticket)
+			raise
+
+	# ── Fin de requête ───────────────────────────────────────────────────
+
+	def _on_success(self, model: str, tokens: int, response: Any) -> None:
+		with self._lock:
+			state = self._state(model)
+			state.in_flight -= 1
+			state.breaker.record_success()
+			used = _usage(response)
+			if used is not None:
+				# Réservation estimée remplacée par la consommation réelle
+				state.tokens.adjust(tokens - used)
+
+	def _on_error(self, model: str, error: BaseException, attempt: int) -> float:
+		"""Enregistre un échec ; retourne le délai avant la tentative suivante ou relève l'erreur."""
+		with self._lock:
+			state = self._state(model)
+			state.in_flight -= 1
+			now = time.monotonic()
+			if _is_transient(error):
+				state.breaker.record_failure(now)
+				self.counters["failures"] += 1
+			elif _status(error) is not None:
+				# Le service a répondu (4xx) : il est joignable
+				state.breaker.record_success()
+			else:
+				state.breaker.trial = False
+
+			if not _is_retryable(error) or attempt >= self.max_retries:
+				raise error
+			retry_after = _retry_after(error)
+			if _status(error) == 429:
+				self.counters["rate_limited"] += 1
+				if retry_after is not None:
+					# Toutes les requêtes du modèle attendent la fin de la pause demandée
+					state.blocked_until = max(state.blocked_until, now + retry_after)
+			self.counters["retries"] += 1
+		# Backoff exponentiel avec aléa (évite que les requêtes en échec repartent ensemble)
+		backoff = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+		return max(backoff, retry_after or 0.0)
+
+	# ── Exécution ────────────────────────────────────────────────────────
+
+	def run(self, model: str, call: Callable[[], T], tokens: int, priority: int = INTERACTIVE) -> T:
+		"""Exécute call() (une requête Groq) dans les limites du modèle, avec nouvelles tentatives."""
+		for attempt in itertools.count():
+			self.acquire(model, tokens, priority)
+			try:
+				response = call()
+			except Exception as e:
+				time.sleep(self._on_error(model, e, attempt))
+				continue
+			self._on_success(model, tokens, response)
+			return response
+
+	async def arun(self, model: str, call: Callable[[], Awaitable[T]], tokens: int, priority: int = BATCH) -> T:
+		"""Version asynchrone de run : call() renvoie une coroutine (nouvelle à chaque tentative)."""
+		for attempt in itertools.count():
+			await self.aacquire(model, tokens, priority)
+			try:
+				response = await call()
+			except Exception as e:
+				await asyncio.sleep(self._on_error(model, e, attempt))
+				continue
+			self._on_success(model, tokens, response)
+			return response
+
+	# ── Suivi ────────────────────────────────────────────────────────────
+
+	def queue_depth(self, model: Optional[str] = None) -> int:
+		"""Requêtes en attente (d'un modèle, ou de tous)."""
+		with self._lock:
+			if model is not None:
+				return len(self._models[model].queue) if model in self._models else 0
+			return sum(len(state.queue) for state in self._models.values())
+
+	def stats(self) -> Dict[str, Any]:
+		"""Compteurs globaux et, par modèle : file par priorité, requêtes en cours, état du disjoncteur."""
+		now = time.monotonic()
+		with self._lock:
+			models = {
+				model: {
+					**{lane: sum(1 for priority, _ in state.queue if priority == value) for value, lane in LANES.items()},
+					"in_flight": state.in_flight,
+					"breaker": state.breaker.state(now),
+					"paused_seconds": round(max(0.0, state.blocked_until - now), 1),
+				}
+				for model, state in self._models.items()
+			}
+			return {**self.counters, "models": models}
+
+
+_scheduler: Optional[RequestScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> RequestScheduler:
+	"""Ordonnanceur du processus (créé au premier appel), partagé par tous les coachs."""
+	global _scheduler
+	with _scheduler_lock:
+		if _scheduler is None:
+			_scheduler = RequestScheduler()
+		return _scheduler
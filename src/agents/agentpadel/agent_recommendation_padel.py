@@ -1,10 +1,12 @@
 from src.agents.agentmanager.agent import Agent
-import json
-from pathlib import Path
+from src.agents.agentmanager.prompt_registry import get_prompt_registry
 
 from src.config import MODEL_NAME_PADEL, GROQ_TEMPERATURE
 
 class PadelCoachAI(Agent):
+    model = MODEL_NAME_PADEL
+    sport = "padel"
+
     def __init__(self, context, user_prompt):
         super().__init__()
         self.context = context
@@ -16,41 +18,23 @@ class PadelCoachAI(Agent):
         Get the analysis as a json as a list and return advices as a json
         """
 
-        # Get the GROQ API response:
-        advices_response = self.client.chat.completions.create(
-            messages = [
-                {"role": "system", "content": self.context},
-                {"role": "user", "content": self.user_prompt},
-        ],
-        model=MODEL_NAME_PADEL,
-        temperature=GROQ_TEMPERATURE,
-        response_format={"type": "json_object"}
-        )
-
-        advices = advices_response.choices[0].message.content
-        if advices is None:
-            raise ValueError("The model returned an empty response.")
+        # Get the GROQ API response (servie depuis le cache si la même requête a déjà été faite):
+        return self.complete_json(self.model, self.context, self.user_prompt, GROQ_TEMPERATURE)
 
-        return json.loads(advices)
+    def stream_recommendations(self, match_data):
+        """
+        Streaming variant of generate_recommendations
+        Yield each entry of "recommandations_coach" as soon as the model has written it
+        """
+        return self.stream_items(self.model, self.context, self.user_prompt, GROQ_TEMPERATURE)
 
 # --- MAIN PROCESS ---
 def main():
-    #get the context, user_prompt and match_data
-    base_dir = Path(__file__).resolve().parent
-
-    with open(base_dir / "example_entry.json", encoding="utf-8") as fichier:
-        match_stats = json.load(fichier)
-
-    with open(base_dir / "context_padel.txt", "r", encoding="utf-8") as f:
-        context = f.read()
-
-    with open(base_dir / "user_prompt_padel.txt", "r", encoding="utf-8") as f:
-        prompt = f.read()
-
-    user_prompt = f"{prompt}\nVoici les données du match : {match_stats}"
+    #get the context, user_prompt and match_data (registre de prompts du sport)
+    match_stats = get_prompt_registry().get("padel").match_data()
 
     # 1. Envoyer au Coach IA
-    coach = PadelCoachAI(context, user_prompt)
+    coach = PadelCoachAI.for_match(match_stats)
     recommandations = coach.generate_recommendations(match_stats)
 
     # 2. Afficher le résultat
@@ -1,7 +1,12 @@
 from dataclasses import dataclass
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional
+import numpy as np
 import pandas as pd
 
+from src.encoding import ZONE_PHRASES, encode_phases, encode_types, zone_label
+from src.rules_engine import COMPILED_RULES, EXPLANATIONS, RECOMMENDATIONS
+from src.temporal_index import EventWindowIndex
+
 
 @dataclass
 class ResponsibilityResult:
@@ -13,138 +18,90 @@ class ResponsibilityResult:
     confidence: str
 
 
-def _clamp_100(a: int, b: int, c: int) -> Tuple[int, int, int]:
-    total = a + b + c
-    if total == 100:
-        return a, b, c
-    if total == 0:
-        return 34, 33, 33
-    a = round(a * 100 / total)
-    b = round(b * 100 / total)
-    c = 100 - a - b
-    return a, b, c
-
-
 def _zone_from_xy(x: float, y: float) -> str:
-    if x >= 80:
-        return "zone du filet (Kitchen)"
-    if x >= 55:
-        return "zone de transition avant"
-    if x >= 35:
-        return "zone médiane"
-    return "fond de court (service)"
+    return zone_label(x, ZONE_PHRASES)
 
 
-def analyze_key_event(event_row: Dict[str, Any], match_events: pd.DataFrame) -> ResponsibilityResult:
+def analyze_key_event(event_row: Dict[str, Any], match_events: pd.DataFrame,
+                      index: Optional[EventWindowIndex] = None, sport: str = "pickleball") -> ResponsibilityResult:
     """
-    IA explicative v1 : règles simples + explications (pickleball).
+    IA explicative v1 : table de règles du sport (rules_engine) + explications.
     event_row : dict d'une ligne sélectionnée
     match_events : tous les events du match (DataFrame)
+    index : index temporel pré-calculé (à réutiliser quand on analyse plusieurs events
+            du même match) ; s'il est groupé par match, event_row doit contenir match_id
     """
 
+    rules = COMPILED_RULES[sport]
+
     event_type = str(event_row.get("type", "")).upper()
     phase = str(event_row.get("phase", "")).lower()
     x = float(event_row.get("x", 50))
     y = float(event_row.get("y", 50))
     minute = int(event_row.get("minute", 0))
 
-    individual = 33
-    collective = 34
-    tactical = 33
+    def count_recent(recent_type: str, window: float) -> np.ndarray:
+        nonlocal index
+        if index is None:
+            index = EventWindowIndex(match_events, types=rules.recent_types)
+        return index.count_many(recent_type, [minute], window, event_row.get("match_id"))
 
-    explanation_parts: List[str] = []
-    recommendations: List[str] = []
-    confidence = "Moyenne"
+    result = rules.evaluate(
+        np.array([event_type], dtype=object), np.array([phase], dtype=object),
+        np.array([x]), np.array([y]), count_recent
+    )
 
     zone = _zone_from_xy(x, y)
+    explanation = " ".join(
+        EXPLANATIONS[code].format(minute=minute, zone=zone) for code in result["explanation_codes"][0]
+    )
 
-    if event_type == "WINNER":
-        explanation_parts.append(f"Point gagné analysé autour de la {minute}e minute, dans la {zone}.")
-        confidence = "Élevée"
-
-        if phase == "transition":
-            collective += 12
-            tactical += 8
-            individual -= 5
-            explanation_parts.append("Le contexte indique une phase de transition vers le filet, souvent liée à une prise d'initiative bien préparée.")
-            recommendations.append("Reproduire ce schéma de montée au filet en binôme lors des prochains points.")
-            recommendations.append("Continuer à synchroniser les déplacements avec le partenaire lors de la transition.")
-
-        if phase == "service":
-            tactical += 15
-            collective += 5
-            individual -= 5
-            explanation_parts.append("Le point intervient sur le service, la structure et le placement de retour priment.")
-            recommendations.append("Revoir le placement de service et la stratégie de retour pour reproduire ce point.")
-
-        if x >= 85:
-            individual += 6
-            explanation_parts.append("L'action se termine très près du filet, ce qui traduit une bonne prise de temps en Kitchen.")
-            recommendations.append("Continuer à travailler la patience dans les échanges de dinks avant l'attaque.")
-
-        recent_errors = match_events[
-            (match_events["type"].str.upper() == "ERROR") &
-            (match_events["minute"] >= minute - 5) &
-            (match_events["minute"] <= minute)
-        ]
-        if len(recent_errors) >= 1:
-            collective += 6
-            explanation_parts.append("Une erreur non forcée récente est détectée avant ce point, ce qui augmente le risque d'instabilité.")
-            recommendations.append("Améliorer la gestion du risque et la constance dans les échanges sous pression.")
-
-    elif event_type == "ERROR":
-        confidence = "Moyenne"
-        explanation_parts.append(f"Erreur non forcée à la {minute}e minute dans la {zone}.")
-        individual += 12
-        collective += 6
-        tactical -= 6
-
-        if phase == "transition":
-            collective += 6
-            explanation_parts.append("L'erreur intervient dans une phase instable, le binôme est potentiellement mal synchronisé.")
-            recommendations.append("Limiter les prises de risque pendant la transition vers le filet.")
-            recommendations.append("Mettre en place un signal clair avec le partenaire pour la montée au filet.")
-
-        if x >= 55:
-            collective += 4
-            explanation_parts.append("L'erreur se situe en zone avancée, ce qui expose le point suivant à l'adversaire.")
-            recommendations.append("Sécuriser l'échange avec un coup plus prudent avant de tenter l'attaque.")
-
-    elif event_type == "SHOT":
-        confidence = "Faible"
-        explanation_parts.append(f"Coup joué à la {minute}e minute dans la {zone}.")
-        collective += 8
-        tactical += 4
-        individual -= 2
-
-        if phase == "transition":
-            collective += 6
-            explanation_parts.append("Coup joué en transition, signe d'une prise d'initiative avant la stabilisation au filet.")
-            recommendations.append("Travailler le timing de la montée au filet après le service ou le retour.")
-
-        if x >= 80:
-            individual += 4
-            explanation_parts.append("Coup joué près du filet, possible retard dans la préparation du dink ou du volley.")
-            recommendations.append("Améliorer la préparation de la raquette avant les échanges au filet.")
+    return ResponsibilityResult(
+        individual=int(result["individual"][0]),
+        collective=int(result["collective"][0]),
+        tactical=int(result["tactical"][0]),
+        explanation=explanation,
+        recommendations=[RECOMMENDATIONS[code] for code in result["recommendation_codes"][0]],
+        confidence=str(result["confidence"][0])
+    )
 
-    else:
-        explanation_parts.append("Événement analysé, règles v1 appliquées.")
-        confidence = "Faible"
 
-    individual, collective, tactical = _clamp_100(individual, collective, tactical)
+def _column(match_events: pd.DataFrame, name: str, default: Any) -> pd.Series:
+    if name in match_events.columns:
+        return match_events[name]
+    return pd.Series(default, index=match_events.index)
 
-    explanation = " ".join(explanation_parts)
-    if not recommendations:
-        recommendations = ["Collecter plus de contexte ou annoter l’action pour améliorer l’explication."]
 
-    return ResponsibilityResult(
-        individual=individual,
-        collective=collective,
-        tactical=tactical,
-        explanation=explanation,
-        recommendations=recommendations,
-        confidence=confidence
-    )
+def analyze_match_events(match_events: pd.DataFrame, sport: str = "pickleball") -> pd.DataFrame:
+    """
+    Mode match complet de analyze_key_event : même table de règles, évaluée en une
+    passe vectorisée au lieu d'un appel Python par event.
+    match_events : events d'un ou plusieurs matchs (les events récents sont comptés
+    par match_id si la colonne existe).
+    Retourne un DataFrame aligné sur l'index d'entrée : individual, collective, tactical,
+    confidence, explanation_codes (EXPLANATIONS), recommendation_codes (RECOMMENDATIONS).
+    """
+
+    rules = COMPILED_RULES[sport]
+
+    event_type = np.asarray(encode_types(_column(match_events, "type", "")), dtype=object)
+    phase = np.asarray(encode_phases(_column(match_events, "phase", "")), dtype=object)
+    x = _column(match_events, "x", 50).to_numpy(dtype=float)
+    y = _column(match_events, "y", 50).to_numpy(dtype=float)
+    minute = _column(match_events, "minute", 0).to_numpy(dtype=float)
+    match_ids = match_events["match_id"].to_numpy() if "match_id" in match_events.columns else None
+
+    index = None
+
+    def count_recent(recent_type: str, window: float) -> np.ndarray:
+        nonlocal index
+        if index is None:
+            by = "match_id" if match_ids is not None else None
+            index = EventWindowIndex(match_events, types=rules.recent_types, by=by)
+        return index.count_many(recent_type, minute, window, match_ids)
+
+    result = rules.evaluate(event_type, phase, x, y, count_recent)
+    return pd.DataFrame(result, index=match_events.index)
 
 
 def generate_tactical_narrative(result, event_row):
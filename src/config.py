@@ -15,6 +15,50 @@ MODEL_NAME_PADEL = os.environ.get("MODEL_NAME_PADEL", "llama-3.3-70b-versatile")
 # Température des complétions Groq (0.0 = réponses déterministes/reproductibles)
 GROQ_TEMPERATURE = float(os.environ.get("GROQ_TEMPERATURE", "0.0"))
 
+# Cache disque des réponses Groq (clé : modèle, température, contexte, prompt ; fichier : GROQ_CACHE_PATH)
+GROQ_CACHE_ENABLED = os.environ.get("GROQ_CACHE_ENABLED", "1") not in ("0", "false", "False")
+GROQ_CACHE_MAX_ENTRIES = int(os.environ.get("GROQ_CACHE_MAX_ENTRIES", "500"))
+GROQ_CACHE_TTL_SECONDS = float(os.environ.get("GROQ_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Nombre maximal de complétions Groq simultanées dans un lot (rapports de plusieurs matchs/séquences)
+GROQ_MAX_CONCURRENCY = int(os.environ.get("GROQ_MAX_CONCURRENCY", "5"))
+
+# Événements clés regroupés dans une même complétion (annotation d'un match entier)
+GROQ_EVENTS_PER_REQUEST = int(os.environ.get("GROQ_EVENTS_PER_REQUEST", "10"))
+
+# Budget de tokens d'entrée d'une requête Groq (contexte + prompt + données du match, estimation locale) ;
+# GROQ_MODEL_TOKEN_BUDGETS fixe un budget par modèle, ex. "llama-3.1-8b-instant=4000,llama-3.3-70b-versatile=8000"
+GROQ_INPUT_TOKEN_BUDGET = int(os.environ.get("GROQ_INPUT_TOKEN_BUDGET", "6000"))
+GROQ_MODEL_TOKEN_BUDGETS = {
+    model.strip(): int(budget)
+    for model, _, budget in (item.partition("=") for item in os.environ.get("GROQ_MODEL_TOKEN_BUDGETS", "").split(","))
+    if model.strip() and budget.strip()
+}
+
+# Ordonnanceur des requêtes Groq : limites par modèle (requêtes et tokens par minute), tokens de réponse
+# réservés par requête, nouvelles tentatives (backoff exponentiel) et disjoncteur ;
+# GROQ_MODEL_RATE_LIMITS fixe les limites d'un modèle précis, ex. "llama-3.1-8b-instant=30:6000"
+GROQ_REQUESTS_PER_MINUTE = int(os.environ.get("GROQ_REQUESTS_PER_MINUTE", "30"))
+GROQ_TOKENS_PER_MINUTE = int(os.environ.get("GROQ_TOKENS_PER_MINUTE", "12000"))
+GROQ_MODEL_RATE_LIMITS = {
+    model.strip(): tuple(int(limit) for limit in limits.split(":"))
+    for model, _, limits in (item.partition("=") for item in os.environ.get("GROQ_MODEL_RATE_LIMITS", "").split(","))
+    if model.strip() and limits.strip()
+}
+GROQ_OUTPUT_TOKENS_RESERVE = int(os.environ.get("GROQ_OUTPUT_TOKENS_RESERVE", "1000"))
+GROQ_MAX_RETRIES = int(os.environ.get("GROQ_MAX_RETRIES", "4"))
+GROQ_BACKOFF_BASE_SECONDS = float(os.environ.get("GROQ_BACKOFF_BASE_SECONDS", "1.0"))
+GROQ_BACKOFF_MAX_SECONDS = float(os.environ.get("GROQ_BACKOFF_MAX_SECONDS", "30"))
+GROQ_BREAKER_FAILURES = int(os.environ.get("GROQ_BREAKER_FAILURES", "5"))
+GROQ_BREAKER_COOLDOWN_SECONDS = float(os.environ.get("GROQ_BREAKER_COOLDOWN_SECONDS", "30"))
+
+# Client HTTP Groq partagé : délais (s) et taille du pool de connexions keep-alive
+GROQ_TIMEOUT_SECONDS = float(os.environ.get("GROQ_TIMEOUT_SECONDS", "60"))
+GROQ_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("GROQ_CONNECT_TIMEOUT_SECONDS", "5"))
+GROQ_POOL_MAX_CONNECTIONS = int(os.environ.get("GROQ_POOL_MAX_CONNECTIONS", "20"))
+GROQ_POOL_MAX_KEEPALIVE = int(os.environ.get("GROQ_POOL_MAX_KEEPALIVE", "10"))
+GROQ_KEEPALIVE_SECONDS = float(os.environ.get("GROQ_KEEPALIVE_SECONDS", "60"))
+
 # Chemins prompts (calculés depuis l'emplacement de ce fichier : toujours corrects,
 # indépendamment de la page Streamlit qui les importe - contrairement à un chemin
 # relatif basé sur __file__ d'une page exécutée via exec()).
@@ -32,6 +76,34 @@ PROMPT_PATHS = {
 # Dossier de données (surchageable pour pointer vers un autre volume, ex. en conteneur)
 DATA_DIR = Path(os.environ.get("DATA_DIR", str(Path(__file__).resolve().parent.parent / "data")))
 
+# Base SQLite locale des matchs et events (importée depuis les CSV de DATA_DIR au premier lancement)
+DB_PATH = Path(os.environ.get("DB_PATH", str(DATA_DIR / "nextmove.db")))
+
+# Store colonnaire binaire des events (memory-mappé par les pages et les moteurs d'analyse)
+EVENT_STORE_DIR = Path(os.environ.get("EVENT_STORE_DIR", str(DATA_DIR / "event_store")))
+
+# Vidéos importées depuis la page Upload, et taille des blocs d'écriture sur disque (la mémoire de l'import
+# reste bornée par le flux source : st.file_uploader garde déjà le fichier entier en mémoire)
+VIDEO_DIR = Path(os.environ.get("VIDEO_DIR", str(DATA_DIR / "videos")))
+UPLOAD_CHUNK_BYTES = int(os.environ.get("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+
+# Fichier du cache des réponses Groq
+GROQ_CACHE_PATH = Path(os.environ.get("GROQ_CACHE_PATH", str(DATA_DIR / "groq_cache.db")))
+
+# File de jobs d'analyse (SQLite) et pool de workers qui les exécute hors des pages
+JOBS_DB_PATH = Path(os.environ.get("JOBS_DB_PATH", str(DATA_DIR / "jobs.db")))
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_POLL_SECONDS = float(os.environ.get("JOB_POLL_SECONDS", "1.0"))
+# Exécutions d'un job interrompues par l'arrêt de son worker (OOM, crash) avant de le marquer en échec
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+
+# Taille des blocs (en lignes) lus à l'import d'un export d'events : borne la mémoire utilisée
+INGEST_CHUNK_ROWS = int(os.environ.get("INGEST_CHUNK_ROWS", "50000"))
+
+# Vocabulaire accepté à l'import (types en majuscules, phases en minuscules ; séparés par des virgules)
+INGEST_EVENT_TYPES = [t.strip().upper() for t in os.environ.get("INGEST_EVENT_TYPES", "WINNER,ERROR,SHOT").split(",") if t.strip()]
+INGEST_EVENT_PHASES = [p.strip().lower() for p in os.environ.get("INGEST_EVENT_PHASES", "service,transition,kitchen").split(",") if p.strip()]
+
 # Personnalisation de l'app (utile pour du white-label / plusieurs déploiements)
 APP_PAGE_TITLE = os.environ.get("APP_PAGE_TITLE", "NextMove")
 APP_PAGE_ICON = os.environ.get("APP_PAGE_ICON", "🏓")
@@ -0,0 +1,92 @@
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+import pandas as pd
+
+from src.config import DATA_DIR, DB_PATH, EVENT_STORE_DIR
+from src.event_store import EventStore, get_event_store
+from src.repository import get_repository
+
+
+# Fichiers dont la modification invalide les données partagées
+WATCHED_FILES = [
+    DATA_DIR / "demo_games.csv",
+    DATA_DIR / "demo_events.csv",
+    DB_PATH,
+    EVENT_STORE_DIR / "meta.json",
+]
+
+_lock = threading.RLock()
+_generation = 0
+_cache: Dict[str, Tuple[Tuple, Any]] = {}
+
+
+def _mtime(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def data_version() -> Tuple:
+    """
+    Version courante des données (mtime des sources + génération explicite).
+    Sert de clé aux caches dérivés (st.cache_data) pour qu'ils suivent les sources.
+    """
+    return (_generation, *(_mtime(path) for path in WATCHED_FILES))
+
+
+def invalidate() -> None:
+    """Force le rechargement au prochain accès (ex. après une écriture en base)."""
+    global _generation
+    with _lock:
+        _generation += 1
+
+
+def _shared(name: str, loader: Callable[[], Any]) -> Any:
+    """Valeur partagée par toutes les sessions, rechargée quand data_version() change."""
+    cached = _cache.get(name)
+    if cached is not None and cached[0] == data_version():
+        return cached[1]
+    with _lock:
+        cached = _cache.get(name)
+        if cached is None or cached[0] != data_version():
+            value = loader()
+            # Version relevée après chargement : le loader peut lui-même (ré)importer les sources
+            cached = _cache[name] = (data_version(), value)
+    return cached[1]
+
+
+def _load_games() -> pd.DataFrame:
+    return get_repository().games()
+
+
+def _load_store() -> EventStore:
+    return get_event_store()
+
+
+def get_event_store_shared() -> EventStore:
+    """Store d'events memory-mappé, ouvert une seule fois par processus."""
+    return _shared("event_store", _load_store)
+
+
+def get_games() -> pd.DataFrame:
+    """
+    Table des matchs (du plus récent au plus ancien). Une seule copie en mémoire par
+    processus : chaque appel renvoie une vue légère (copy-on-write), que l'appelant
+    peut modifier sans toucher la copie partagée.
+    """
+    return _shared("games", _load_games).copy(deep=False)
+
+
+def get_events() -> pd.DataFrame:
+    """Tous les events, en vues sur le store memory-mappé partagé (aucune copie des colonnes)."""
+    return get_event_store_shared().events()
+
+
+def get_match_events(match_id: int) -> pd.DataFrame:
+    """
+    Events d'un match via l'index match_id -> plage de lignes du store (O(1), sans
+    parcours de la table) : vue directe sur le memory-map, à ne pas modifier en place.
+    """
+    return get_event_store_shared().match_events(match_id)
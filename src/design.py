@@ -113,6 +113,16 @@ def strengths_focus(strengths, focus_areas):
         rows = "".join([f'<div style="display:flex;justify-content:space-between;padding:4px 0;font-size:14px;"><span>{n}</span><span style="font-weight:600;color:#FF9500">{s}</span></div>' for n,s in focus_areas])
         st.markdown(f'<div class="nm-card-orange"><div style="font-size:16px;font-weight:600;color:#B35500;margin-bottom:12px;">🎯 Focus Areas</div>{rows}</div>', unsafe_allow_html=True)
 
+JOB_LABELS = {"patterns": "📈 Patterns", "rules": "⚖️ Rule scoring", "ai_report": "🧠 AI report"}
+JOB_ICONS = {"queued": "⏳", "running": "🔄", "done": "✅", "failed": "⚠️"}
+
+def job_progress(jobs):
+    for job in jobs:
+        label = f"{JOB_ICONS.get(job.status, '')} {JOB_LABELS.get(job.kind, job.kind)} — {job.message or job.status}"
+        st.progress(job.progress, text=label)
+        if job.status == "failed" and job.error:
+            st.caption(job.error.splitlines()[0])
+
 def section_title(title):
     st.markdown(f'<h2>{title}</h2>', unsafe_allow_html=True)
 
@@ -0,0 +1,69 @@
+from bisect import bisect_right
+from typing import Callable, List
+import numpy as np
+import pandas as pd
+
+
+# Zones du court basées sur la distance au filet (x=100 -> au filet).
+# Seuils inclusifs à gauche : x >= 80 -> filet, x >= 55 -> transition, x >= 35 -> médiane.
+ZONE_THRESHOLDS: List[float] = [35, 55, 80]
+ZONE_EDGES: List[float] = [-np.inf, *ZONE_THRESHOLDS, np.inf]
+
+# Libellés par zone, du fond de court vers le filet
+ZONE_LABELS: List[str] = [
+    "Zone de fond de court (service)",
+    "Zone médiane",
+    "Zone de transition avant",
+    "Zone du filet (Kitchen)",
+]
+# Même découpage, formulé pour être inséré dans une phrase ("dans la ...")
+ZONE_PHRASES: List[str] = [
+    "fond de court (service)",
+    "zone médiane",
+    "zone de transition avant",
+    "zone du filet (Kitchen)",
+]
+
+
+def zone_label(x: float, labels: List[str] = ZONE_LABELS) -> str:
+    """Zone d'une position x unique."""
+    if x != x:  # NaN : aucun seuil atteint
+        return labels[0]
+    return labels[bisect_right(ZONE_THRESHOLDS, x)]
+
+
+def encode_zones(x: pd.Series, labels: List[str] = ZONE_LABELS) -> pd.Categorical:
+    """Zones de toute une colonne x, en un seul découpage par intervalles."""
+    zones = pd.cut(np.asarray(x, dtype=float), ZONE_EDGES, right=False, labels=labels)
+    return zones.fillna(labels[0])
+
+
+def _normalized_categorical(values: pd.Series, normalize: Callable[[pd.Index], pd.Index]) -> pd.Categorical:
+    """Catégorielle dont les valeurs sont normalisées une fois par modalité, pas par ligne."""
+    raw = pd.Categorical(values)
+    normalized = normalize(raw.categories.astype(str))
+    remap, categories = pd.factorize(normalized)
+    codes = np.where(raw.codes >= 0, remap[raw.codes], -1)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def encode_types(event_type: pd.Series) -> pd.Categorical:
+    """Types d'events en majuscules (WINNER, ERROR, SHOT...)."""
+    return _normalized_categorical(event_type, lambda c: c.str.upper())
+
+
+def encode_phases(phase: pd.Series) -> pd.Categorical:
+    """Phases de jeu en minuscules (service, transition, kitchen...)."""
+    return _normalized_categorical(phase, lambda c: c.str.lower())
+
+
+def encode_events(events: pd.DataFrame) -> pd.DataFrame:
+    """
+    Encodage partagé des colonnes d'events, calculé une seule fois et sans modifier
+    events : type (majuscules), phase_key (minuscules) et zone (catégorielles).
+    """
+    return pd.DataFrame({
+        "type": encode_types(events["type"]),
+        "phase_key": encode_phases(events["phase"]),
+        "zone": encode_zones(events["x"]),
+    }, index=events.index)
@@ -0,0 +1,238 @@
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from src.config import EVENT_STORE_DIR
+from src.repository import get_repository
+
+
+# Colonnes physiques du store et leur type compact (une colonne = un fichier binaire brut)
+COLUMN_DTYPES: Dict[str, np.dtype] = {
+    "match_id": np.dtype(np.int32),
+    "type": np.dtype(np.int8),      # code dans le dictionnaire "type"
+    "phase": np.dtype(np.int8),     # code dans le dictionnaire "phase"
+    "sport": np.dtype(np.int8),     # code dans le dictionnaire "sport"
+    "x": np.dtype(np.float32),      # 0-100, sans arrondi (seuils des règles préservés), NaN = manquante
+    "y": np.dtype(np.float32),      # 0-100, sans arrondi, NaN = manquante
+    "minute": np.dtype(np.uint16),  # MISSING_MINUTE = manquante
+}
+CATEGORICAL_COLUMNS = ["type", "phase", "sport"]
+
+# Valeur réservée aux minutes manquantes (relue comme NaN)
+MISSING_MINUTE = np.iinfo(np.uint16).max
+
+# Table des offsets : une ligne par bloc contigu de lignes d'un même match
+OFFSET_DTYPE = np.dtype([("match_id", np.int64), ("start", np.int64), ("stop", np.int64)])
+
+FORMAT_VERSION = 2
+
+
+def _encode(values: pd.Series, dictionary: List[str]) -> np.ndarray:
+    """Codes int8 des valeurs dans le dictionnaire (étendu si besoin) ; -1 = valeur manquante."""
+    values = values.astype("string")
+    for value in values.dropna().unique():
+        if value not in dictionary:
+            dictionary.append(str(value))
+    if len(dictionary) > np.iinfo(np.int8).max:
+        raise ValueError(f"Trop de modalités distinctes pour un code int8 ({len(dictionary)})")
+    return pd.Categorical(values, categories=dictionary).codes.astype(np.int8)
+
+
+def _encode_columns(events: pd.DataFrame, dictionaries: Dict[str, List[str]]) -> Dict[str, np.ndarray]:
+    """
+    Colonnes compactes d'un DataFrame d'events : x/y bornés à [0, 100] sans arrondi,
+    minute >= 0 ; les valeurs manquantes restent NaN (x/y) ou MISSING_MINUTE (minute).
+    """
+    minute = events["minute"].to_numpy(dtype=float)
+    return {
+        "match_id": events["match_id"].to_numpy().astype(np.int32),
+        "type": _encode(events["type"], dictionaries["type"]),
+        "phase": _encode(events["phase"], dictionaries["phase"]),
+        "sport": _encode(events["sport"] if "sport" in events.columns else pd.Series(None, index=events.index, dtype=object),
+                         dictionaries["sport"]),
+        "x": np.clip(events["x"].to_numpy(dtype=float), 0, 100).astype(np.float32),
+        "y": np.clip(events["y"].to_numpy(dtype=float), 0, 100).astype(np.float32),
+        "minute": np.where(np.isnan(minute), MISSING_MINUTE,
+                           np.clip(np.nan_to_num(minute), 0, MISSING_MINUTE - 1)).astype(np.uint16),
+    }
+
+
+def _runs(match_ids: np.ndarray, base: int = 0) -> np.ndarray:
+    """Blocs contigus (match_id, start, stop) d'une colonne match_id."""
+    if len(match_ids) == 0:
+        return np.empty(0, dtype=OFFSET_DTYPE)
+    starts = np.flatnonzero(np.r_[True, match_ids[1:] != match_ids[:-1]])
+    stops = np.r_[starts[1:], len(match_ids)]
+    runs = np.empty(len(starts), dtype=OFFSET_DTYPE)
+    runs["match_id"] = match_ids[starts]
+    runs["start"] = starts + base
+    runs["stop"] = stops + base
+    return runs
+
+
+def _write_meta(path: Path, rows: int, dictionaries: Dict[str, List[str]], source: Optional[int]) -> None:
+    tmp = path / "meta.json.tmp"
+    tmp.write_text(json.dumps({
+        "version": FORMAT_VERSION,
+        "rows": rows,
+        "dictionaries": dictionaries,
+        "source": source,
+    }, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path / "meta.json")
+
+
+class EventStore:
+    """
+    Store colonnaire binaire des events, ouvert en memory-map : la mémoire n'est
+    chargée qu'à la lecture des pages utiles et les slices par match sont des vues
+    (aucune copie des colonnes numériques ni des codes des catégorielles).
+    """
+
+    def __init__(self, path: Path = EVENT_STORE_DIR):
+        self.path = Path(path)
+        meta = json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        if meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"Version de store non supportée : {meta['version']}")
+
+        self.rows: int = meta["rows"]
+        self.source: Optional[int] = meta.get("source")
+        self.dictionaries: Dict[str, List[str]] = meta["dictionaries"]
+        self.columns: Dict[str, np.ndarray] = {
+            name: self._map(name, dtype) for name, dtype in COLUMN_DTYPES.items()
+        }
+        self.offsets: np.ndarray = np.fromfile(self.path / "offsets.bin", dtype=OFFSET_DTYPE)
+        # Blocs au-delà de rows : reste d'un ajout interrompu avant l'écriture de meta.json
+        self.offsets = self.offsets[self.offsets["start"] < self.rows]
+        self.offsets["stop"] = np.minimum(self.offsets["stop"], self.rows)
+
+        # match_id -> blocs de lignes, construit une fois à l'ouverture
+        self._runs: Dict[int, List[Tuple[int, int]]] = {}
+        for match_id, start, stop in self.offsets.tolist():
+            self._runs.setdefault(match_id, []).append((start, stop))
+
+    def append(self, events: pd.DataFrame, games: Optional[pd.DataFrame] = None) -> int:
+        """
+        Ajoute des events en fin de store (sans réécrire l'existant) et met à jour
+        l'index par match de façon incrémentale. Les events d'un même match restent
+        contigus dans le lot ; un lot qui prolonge le dernier match étend son bloc.
+        meta.json est écrit en dernier : un ajout interrompu n'est jamais visible.
+        """
+        if len(events) == 0:
+            return 0
+        events = events.iloc[np.argsort(events["match_id"].to_numpy(), kind="stable")]
+        if games is not None and "sport" not in events.columns:
+            sports = games.set_index("game_id")["sport"]
+            events = events.assign(sport=events["match_id"].map(sports))
+
+        dictionaries = {name: list(values) for name, values in self.dictionaries.items()}
+        columns = _encode_columns(events, dictionaries)
+
+        for name, column in columns.items():
+            with open(self.path / f"{name}.bin", "ab") as f:
+                # Tronque d'éventuels restes d'un ajout interrompu avant d'écrire
+                f.truncate(self.rows * COLUMN_DTYPES[name].itemsize)
+                column.tofile(f)
+
+        runs = _runs(columns["match_id"], base=self.rows)
+        offsets = self.offsets.copy()
+        extends = len(offsets) > 0 and offsets[-1]["match_id"] == runs[0]["match_id"]
+        if extends:
+            offsets[-1]["stop"] = runs[0]["stop"]
+            runs = runs[1:]
+        offsets = np.concatenate([offsets, runs])
+        tmp = self.path / "offsets.bin.tmp"
+        offsets.tofile(tmp)
+        tmp.replace(self.path / "offsets.bin")
+
+        _write_meta(self.path, self.rows + len(events), dictionaries, self.source)
+
+        # Index par match mis à jour avec les seuls blocs du lot
+        if extends:
+            match_id, start, stop = offsets[-len(runs) - 1].tolist()
+            self._runs[match_id][-1] = (start, stop)
+        for match_id, start, stop in runs.tolist():
+            self._runs.setdefault(match_id, []).append((start, stop))
+        self.offsets = offsets
+        self.rows += len(events)
+        self.dictionaries = dictionaries
+        self.columns = {name: self._map(name, dtype) for name, dtype in COLUMN_DTYPES.items()}
+        return len(events)
+
+    def _map(self, name: str, dtype: np.dtype) -> np.ndarray:
+        if self.rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self.path / f"{name}.bin", dtype=dtype, mode="r", shape=(self.rows,))
+
+    def match_ids(self) -> List[int]:
+        return list(self._runs)
+
+    def _frame(self, rows: slice) -> pd.DataFrame:
+        data: Dict[str, Any] = {}
+        for name in COLUMN_DTYPES:
+            column = self.columns[name][rows]
+            if name in CATEGORICAL_COLUMNS:
+                column = pd.Categorical.from_codes(column, categories=self.dictionaries[name], validate=False)
+            elif name == "minute" and (column == MISSING_MINUTE).any():
+                # Copie en flottants seulement si le bloc contient des minutes manquantes
+                column = np.where(column == MISSING_MINUTE, np.nan, column)
+            data[name] = column
+        return pd.DataFrame(data, copy=False)
+
+    def events(self) -> pd.DataFrame:
+        """Tous les events (vues sur le memory-map)."""
+        return self._frame(slice(0, self.rows))
+
+    def match_events(self, match_id: int) -> pd.DataFrame:
+        """Events d'un match : vue directe si le match est contigu, concaténation sinon."""
+        runs = self._runs.get(int(match_id), [])
+        if len(runs) == 1:
+            start, stop = runs[0]
+            return self._frame(slice(start, stop))
+        if not runs:
+            return self._frame(slice(0, 0))
+        return pd.concat([self._frame(slice(start, stop)) for start, stop in runs], ignore_index=True)
+
+
+def build_event_store(events: pd.DataFrame, path: Path = EVENT_STORE_DIR,
+                      games: Optional[pd.DataFrame] = None, source: Optional[int] = None) -> EventStore:
+    """
+    Écrit (ou remplace) le store à partir d'un DataFrame d'events. Les lignes sont
+    regroupées par match (ordre d'origine conservé dans un match) pour qu'un match
+    soit un bloc contigu. games (game_id, sport) renseigne le sport de chaque event.
+    source : numéro d'import du repository dont le store est issu.
+    """
+    path = Path(path)
+    events = events.iloc[np.argsort(events["match_id"].to_numpy(), kind="stable")]
+    if games is not None and "sport" not in events.columns:
+        sports = games.set_index("game_id")["sport"]
+        events = events.assign(sport=events["match_id"].map(sports))
+
+    dictionaries: Dict[str, List[str]] = {name: [] for name in CATEGORICAL_COLUMNS}
+    columns = _encode_columns(events, dictionaries)
+
+    # Écriture dans un dossier temporaire puis remplacement : les lecteurs ne voient jamais un store partiel
+    tmp = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    for name, column in columns.items():
+        column.tofile(tmp / f"{name}.bin")
+    _runs(columns["match_id"]).tofile(tmp / "offsets.bin")
+    _write_meta(tmp, len(events), dictionaries, source)
+
+    shutil.rmtree(path, ignore_errors=True)
+    tmp.rename(path)
+    return EventStore(path)
+
+
+def get_event_store(path: Path = EVENT_STORE_DIR) -> EventStore:
+    """Store prêt à l'emploi : (re)construit depuis le repository SQLite s'il manque ou est périmé."""
+    repo = get_repository()
+    meta_path = Path(path) / "meta.json"
+    meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+    # Store d'un ancien format ou d'un autre import : reconstruit
+    if meta.get("version") != FORMAT_VERSION or meta.get("source") is None or meta["source"] != repo.import_id():
+        return build_event_store(repo.events(), path, repo.games(), repo.import_id())
+    return EventStore(path)
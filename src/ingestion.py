@@ -0,0 +1,124 @@
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+import pandas as pd
+
+from src.config import DATA_DIR, INGEST_CHUNK_ROWS, INGEST_EVENT_PHASES, INGEST_EVENT_TYPES
+from src.event_store import MISSING_MINUTE, get_event_store
+from src.repository import EVENT_COLUMNS, get_repository
+
+
+@dataclass
+class IngestionReport:
+    """Bilan d'un import : lignes acceptées / rejetées et fichier des rejets."""
+    source: Path
+    chunks: int = 0
+    accepted: int = 0
+    rejected: int = 0
+    rejects_path: Optional[Path] = None
+
+
+def read_chunks(path: Path, chunk_rows: int = INGEST_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Lit un export d'events CSV ou JSONL par blocs d'au plus chunk_rows lignes."""
+    path = Path(path)
+    if path.suffix.lower() in (".jsonl", ".ndjson"):
+        reader = pd.read_json(path, lines=True, chunksize=chunk_rows, dtype=False)
+    else:
+        reader = pd.read_csv(path, chunksize=chunk_rows)
+    with reader:
+        yield from reader
+
+
+def validate_chunk(chunk: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Contrôle et typage d'un bloc d'events. Retourne (events valides, rejets) ; chaque
+    rejet garde ses colonnes d'origine et un motif (reason).
+    Règles : match_id entier, type dans INGEST_EVENT_TYPES, phase absente ou dans
+    INGEST_EVENT_PHASES, x/y dans [0, 100], minute entière >= 0.
+    """
+    missing = [column for column in EVENT_COLUMNS if column not in chunk.columns and column != "phase"]
+    if missing:
+        raise ValueError(f"Colonnes manquantes dans l'export : {', '.join(missing)}")
+
+    match_id = pd.to_numeric(chunk["match_id"], errors="coerce")
+    event_type = chunk["type"].astype("string").str.strip().str.upper()
+    phase = chunk["phase"].astype("string").str.strip().str.lower() if "phase" in chunk.columns else pd.Series(pd.NA, index=chunk.index, dtype="string")
+    phase = phase.replace("", pd.NA)
+    x = pd.to_numeric(chunk["x"], errors="coerce")
+    y = pd.to_numeric(chunk["y"], errors="coerce")
+    minute = pd.to_numeric(chunk["minute"], errors="coerce")
+
+    # Premier motif de rejet de chaque ligne (les règles sont évaluées dans l'ordre)
+    checks = [
+        ("match_id invalide", match_id.isna() | (match_id % 1 != 0)),
+        ("type manquant", event_type.isna() | (event_type == "")),
+        ("type inconnu", ~event_type.isin(INGEST_EVENT_TYPES)),
+        ("phase inconnue", phase.notna() & ~phase.isin(INGEST_EVENT_PHASES)),
+        ("x hors [0, 100]", ~x.between(0, 100)),
+        ("y hors [0, 100]", ~y.between(0, 100)),
+        ("minute invalide", ~minute.between(0, MISSING_MINUTE - 1) | (minute % 1 != 0)),
+    ]
+    reason = pd.Series(pd.NA, index=chunk.index, dtype="string")
+    for label, failed in checks:
+        reason = reason.mask(reason.isna() & failed.fillna(True).astype(bool), label)
+
+    valid = reason.isna().to_numpy()
+    events = pd.DataFrame({
+        "match_id": match_id[valid].astype("int64"),
+        "type": event_type[valid].astype(object),
+        "phase": phase[valid].astype(object),
+        "x": x[valid].astype("float64"),
+        "y": y[valid].astype("float64"),
+        "minute": minute[valid].astype("int64"),
+    })
+    return events, chunk[~valid].assign(reason=reason[~valid])
+
+
+def ingest_events(path: Path, chunk_rows: int = INGEST_CHUNK_ROWS,
+                  rejects_path: Optional[Path] = None) -> IngestionReport:
+    """
+    Import en flux d'un export d'events (CSV/JSONL) : chaque bloc est validé, ses
+    rejets ajoutés au fichier des rejets, et ses events ajoutés à la base SQLite et
+    au store (index par match mis à jour bloc par bloc). Mémoire bornée par chunk_rows,
+    quelle que soit la taille du fichier.
+    """
+    path = Path(path)
+    rejects_path = Path(rejects_path) if rejects_path else DATA_DIR / "rejected" / f"{path.name}.rejected.csv"
+    rejects_path.unlink(missing_ok=True)
+    report = IngestionReport(source=path)
+
+    repo = get_repository()
+    store = get_event_store()
+    games = repo.games()[["game_id", "sport"]]
+
+    for chunk in read_chunks(path, chunk_rows):
+        events, rejected = validate_chunk(chunk)
+        report.chunks += 1
+
+        if len(rejected):
+            rejects_path.parent.mkdir(parents=True, exist_ok=True)
+            rejected.to_csv(rejects_path, mode="a", index=False, header=report.rejected == 0)
+            report.rejected += len(rejected)
+            report.rejects_path = rejects_path
+
+        if len(events):
+            repo.append_events(events)
+            store.append(events, games)
+            report.accepted += len(events)
+
+    return report
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage : python -m src.ingestion <export.csv|export.jsonl> [...]")
+        sys.exit(1)
+    for arg in sys.argv[1:]:
+        report = ingest_events(Path(arg))
+        print(f"{report.source} : {report.accepted} events importés, {report.rejected} rejetés "
+              f"({report.chunks} blocs)" + (f" -> {report.rejects_path}" if report.rejects_path else ""))
+
+
+if __name__ == "__main__":
+    main()
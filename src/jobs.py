@@ -0,0 +1,328 @@
+import json
+import multiprocessing
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import time
+import traceback
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+from src.config import (DATA_DIR, GROQ_API_KEY, JOB_MAX_ATTEMPTS, JOB_POLL_SECONDS, JOB_WORKERS, JOBS_DB_PATH,
+                        PROMPT_PATHS)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind        TEXT NOT NULL,
+    game_id     INTEGER,
+    payload     TEXT NOT NULL,
+    status      TEXT NOT NULL DEFAULT 'queued',
+    progress    REAL NOT NULL DEFAULT 0,
+    message     TEXT,
+    result      TEXT,
+    error       TEXT,
+    worker_pid  INTEGER,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    created_at  TEXT NOT NULL,
+    started_at  TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, job_id);
+CREATE INDEX IF NOT EXISTS idx_jobs_game ON jobs (game_id, job_id);
+"""
+
+# Jobs lancés par "Analyze" : patterns, scoring des règles, rapport IA
+ANALYSIS_JOBS = ["patterns", "rules", "ai_report"]
+
+PID_FILE = DATA_DIR / "jobs.pid"
+# Le superviseur touche PID_FILE à chaque tour : un fichier plus vieux que ce délai = pool arrêté
+HEARTBEAT_SECONDS = 5
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+@dataclass
+class Job:
+    job_id: int
+    kind: str
+    game_id: Optional[int]
+    payload: Dict[str, Any]
+    status: str
+    progress: float
+    message: Optional[str]
+    result: Optional[Any]
+    error: Optional[str]
+    created_at: str
+    finished_at: Optional[str]
+    attempts: int = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        return cls(
+            job_id=row["job_id"],
+            kind=row["kind"],
+            game_id=row["game_id"],
+            payload=json.loads(row["payload"]),
+            status=row["status"],
+            progress=row["progress"],
+            message=row["message"],
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            created_at=row["created_at"],
+            finished_at=row["finished_at"],
+            attempts=row["attempts"],
+        )
+
+
+class JobQueue:
+    """
+    File de jobs d'analyse persistée dans SQLite : les pages y déposent des jobs et
+    lisent leur avancement, les workers (processus séparés) les exécutent. État,
+    progression et résultats survivent à un redémarrage de l'app.
+    """
+
+    def __init__(self, path: Path = JOBS_DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            # File créée avant le compteur d'exécutions
+            if "attempts" not in [row["name"] for row in conn.execute("PRAGMA table_info(jobs)")]:
+                conn.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def submit(self, kind: str, payload: Dict[str, Any], game_id: Optional[int] = None) -> int:
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Type de job inconnu : {kind}")
+        with self._connect() as conn:
+            return conn.execute(
+                "INSERT INTO jobs (kind, game_id, payload, created_at) VALUES (?, ?, ?, ?)",
+                (kind, game_id, json.dumps(payload, ensure_ascii=False), _now()),
+            ).lastrowid
+
+    def claim(self, worker_pid: int) -> Optional[Job]:
+        """Prend le plus ancien job en attente (un seul worker peut l'obtenir) et compte l'exécution."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT * FROM jobs WHERE status = 'queued' ORDER BY job_id LIMIT 1").fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute("UPDATE jobs SET status = 'running', worker_pid = ?, started_at = ?, message = NULL, "
+                         "attempts = attempts + 1 WHERE job_id = ?", (worker_pid, _now(), row["job_id"]))
+            conn.execute("COMMIT")
+        return self.job(row["job_id"])
+
+    def update_progress(self, job_id: int, progress: float, message: Optional[str] = None) -> None:
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET progress = ?, message = ? WHERE job_id = ?",
+                         (min(max(progress, 0.0), 1.0), message, job_id))
+
+    def complete(self, job_id: int, result: Any, message: Optional[str] = None) -> None:
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET status = 'done', progress = 1, message = ?, result = ?, finished_at = ? WHERE job_id = ?",
+                         (message, json.dumps(result, ensure_ascii=False, default=str), _now(), job_id))
+
+    def fail(self, job_id: int, error: str) -> None:
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE job_id = ?",
+                         (error, _now(), job_id))
+
+    def requeue_orphans(self, live_pids: Set[int], max_attempts: int = JOB_MAX_ATTEMPTS) -> int:
+        """
+        Remet en attente les jobs "running" dont le worker n'est plus vivant (crash,
+        redémarrage). Un job qui a déjà arrêté son worker max_attempts fois (OOM,
+        segfault...) est marqué en échec au lieu d'en arrêter un de plus.
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT job_id, worker_pid, attempts FROM jobs WHERE status = 'running'").fetchall()
+            orphans = [row for row in rows if row["worker_pid"] not in live_pids]
+            conn.executemany("UPDATE jobs SET status = 'queued', worker_pid = NULL WHERE job_id = ?",
+                             [(row["job_id"],) for row in orphans if row["attempts"] < max_attempts])
+            conn.executemany("UPDATE jobs SET status = 'failed', worker_pid = NULL, error = ?, finished_at = ? WHERE job_id = ?",
+                             [(f"Worker arrêté pendant le job à {row['attempts']} reprises (abandonné)", _now(), row["job_id"])
+                              for row in orphans if row["attempts"] >= max_attempts])
+        return len(orphans)
+
+    def job(self, job_id: int) -> Optional[Job]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (int(job_id),)).fetchone()
+        return Job.from_row(row) if row else None
+
+    def jobs_for_game(self, game_id: int) -> List[Job]:
+        """Derniers jobs de chaque type pour un match."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE job_id IN (SELECT MAX(job_id) FROM jobs WHERE game_id = ? GROUP BY kind) "
+                "ORDER BY job_id", (int(game_id),),
+            ).fetchall()
+        return [Job.from_row(row) for row in rows]
+
+    def queue_depth(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')").fetchone()[0]
+
+
+# ── Handlers ─────────────────────────────────────────────────────────
+
+Progress = Callable[[float, str], None]
+
+
+def _run_patterns(payload: Dict[str, Any], progress: Progress) -> Dict[str, Any]:
+    from src.data_access import get_match_events
+    from src.patterns_engine import compute_match_patterns
+
+    progress(0.2, "Lecture des events du match")
+    events = get_match_events(payload["game_id"])
+    progress(0.6, "Calcul des patterns")
+    return compute_match_patterns(events)
+
+
+def _run_rules(payload: Dict[str, Any], progress: Progress) -> Dict[str, Any]:
+    from src.analysis_engine import analyze_match_events
+    from src.data_access import get_match_events
+    from src.rules_engine import COMPILED_RULES
+
+    sport = payload.get("sport", "pickleball")
+    if sport not in COMPILED_RULES:
+        # Pas de table de règles pour ce sport (seul le pickleball en a une) : job terminé sans scoring
+        return {"skipped": f"Pas de table de règles pour le sport « {sport} »"}
+
+    progress(0.2, "Lecture des events du match")
+    events = get_match_events(payload["game_id"])
+    progress(0.5, "Évaluation des règles")
+    scores = analyze_match_events(events, sport)
+    return {
+        "events": len(scores),
+        "responsibility": {
+            column: round(float(scores[column].mean()), 1) if len(scores) else None
+            for column in ("individual", "collective", "tactical")
+        },
+        "explanations": scores["explanation_codes"].explode().value_counts().to_dict() if len(scores) else {},
+    }
+
+
+def _run_ai_report(payload: Dict[str, Any], progress: Progress) -> Dict[str, Any]:
+    if not GROQ_API_KEY:
+        raise RuntimeError("GROQ_API_KEY manquante : rapport IA indisponible")
+    from src.data_access import get_match_events
+    from src.patterns_engine import compute_match_patterns
+    from src.agents.agentmanager.agent import coach_class
+    from src.agents.agentmanager.prompt_registry import get_prompt_registry
+    from src.agents.agentmanager.scheduler import BATCH
+
+    sport = payload.get("sport", "pickleball")
+    sport = sport if sport in PROMPT_PATHS else "pickleball"
+    progress(0.1, "Préparation des données du match")
+    match_data = get_prompt_registry().get(sport).match_data()
+    match_data["resume_patterns"] = compute_match_patterns(get_match_events(payload["game_id"]))
+
+    progress(0.3, "Génération du rapport IA")
+    coach = coach_class(sport).for_match(match_data, "Voici l'intégralité des données du match")
+    # Rapport en arrière-plan : file "lot" de l'ordonnanceur, derrière les requêtes interactives
+    coach.priority = BATCH
+    return coach.generate_recommendations(match_data)
+
+
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any], Progress], Any]] = {
+    "patterns": _run_patterns,
+    "rules": _run_rules,
+    "ai_report": _run_ai_report,
+}
+
+
+def submit_analysis(game_id: int, sport: str, queue: Optional[JobQueue] = None) -> List[int]:
+    """Met en file les jobs d'analyse d'un match et s'assure que les workers tournent."""
+    queue = queue or JobQueue()
+    job_ids = [queue.submit(kind, {"game_id": int(game_id), "sport": sport.lower()}, int(game_id))
+               for kind in ANALYSIS_JOBS]
+    ensure_worker_pool()
+    return job_ids
+
+
+# ── Workers ──────────────────────────────────────────────────────────
+
+def run_worker(path: Path = JOBS_DB_PATH, poll_seconds: float = JOB_POLL_SECONDS) -> None:
+    """Boucle d'un worker : prend un job, l'exécute, enregistre résultat ou erreur."""
+    queue = JobQueue(path)
+    pid = os.getpid()
+    while True:
+        job = queue.claim(pid)
+        if job is None:
+            time.sleep(poll_seconds)
+            continue
+        try:
+            result = JOB_HANDLERS[job.kind](job.payload, lambda p, m=None: queue.update_progress(job.job_id, p, m))
+        except Exception as e:
+            queue.fail(job.job_id, f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=5)}")
+        else:
+            # Un handler qui n'a rien à faire renvoie {"skipped": motif}, affiché comme message du job
+            queue.complete(job.job_id, result, result.get("skipped") if isinstance(result, dict) else None)
+
+
+def run_pool(workers: int = JOB_WORKERS, path: Path = JOBS_DB_PATH) -> None:
+    """Lance workers processus worker et les relance s'ils s'arrêtent (processus superviseur)."""
+    PID_FILE.parent.mkdir(parents=True, exist_ok=True)
+    PID_FILE.write_text(str(os.getpid()))
+    queue = JobQueue(path)
+    processes: List[multiprocessing.Process] = []
+
+    def stop(*_):
+        for process in processes:
+            process.terminate()
+        PID_FILE.unlink(missing_ok=True)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    try:
+        while True:
+            processes = [p for p in processes if p.is_alive()]
+            # Tous les workers sont des enfants du superviseur : un job tenu par un autre PID est orphelin
+            queue.requeue_orphans({p.pid for p in processes})
+            while len(processes) < workers:
+                process = multiprocessing.Process(target=run_worker, args=(path,), daemon=True)
+                process.start()
+                processes.append(process)
+            PID_FILE.touch()
+            time.sleep(HEARTBEAT_SECONDS)
+    finally:
+        PID_FILE.unlink(missing_ok=True)
+
+
+def ensure_worker_pool() -> None:
+    """Démarre le pool de workers (processus détaché) s'il ne tourne pas déjà."""
+    # Battement de cœur par date de modification (portable, sans signal vers un PID peut-être réutilisé)
+    if PID_FILE.exists() and time.time() - PID_FILE.stat().st_mtime < 3 * HEARTBEAT_SECONDS:
+        return
+    root = Path(__file__).resolve().parent.parent
+    process = subprocess.Popen([sys.executable, "-m", "src.jobs"], cwd=root, start_new_session=os.name != "nt",
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # PID écrit tout de suite : un second appel immédiat ne lance pas un deuxième pool
+    PID_FILE.parent.mkdir(parents=True, exist_ok=True)
+    PID_FILE.write_text(str(process.pid))
+
+
+if __name__ == "__main__":
+    run_pool()
@@ -1,49 +1,16 @@
-from typing import Dict, Any
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, Iterable, Optional, Union
 import pandas as pd
 
+from src.encoding import encode_events
 
-def compute_match_patterns(match_events: pd.DataFrame) -> Dict[str, Any]:
-    """Analyse des patterns tactiques d'un match de pickleball."""
-
-    summary = {}
-
-    total_events = len(match_events)
-    total_winners = (match_events["type"].str.upper() == "WINNER").sum()
-    total_shots = (match_events["type"].str.upper() == "SHOT").sum()
-    total_errors = (match_events["type"].str.upper() == "ERROR").sum()
-
-    summary["total_events"] = int(total_events)
-    summary["total_winners"] = int(total_winners)
-    summary["total_shots"] = int(total_shots)
-    summary["total_errors"] = int(total_errors)
-
-    # Phases de jeu dangereuses (service, transition, filet/kitchen)
-    phase_counts = match_events["phase"].value_counts().to_dict()
-    summary["phase_distribution"] = phase_counts
-
-    # Zones à risque (basées sur la distance au filet, x=100 -> au filet)
-    def zone(x):
-        if x >= 80:
-            return "Zone du filet (Kitchen)"
-        elif x >= 55:
-            return "Zone de transition avant"
-        elif x >= 35:
-            return "Zone médiane"
-        else:
-            return "Zone de fond de court (service)"
-
-    match_events["zone"] = match_events["x"].apply(zone)
-    zone_counts = match_events["zone"].value_counts().to_dict()
-    summary["zone_distribution"] = zone_counts
-
-    # Détection simple de vulnérabilité en phase de transition
-    transition_events = match_events[
-        match_events["phase"].str.lower() == "transition"
-    ]
-
-    summary["transition_risk_ratio"] = round(
-        len(transition_events) / total_events, 2
-    ) if total_events > 0 else 0
+
+def _insights_and_priority(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Synthèse automatique et priorité d'action, à partir des compteurs d'un match."""
+    total_events = summary["total_events"]
 
     # Génération synthèse automatique
     insights = []
@@ -54,21 +21,168 @@ def compute_match_patterns(match_events: pd.DataFrame) -> Dict[str, Any]:
     if summary["zone_distribution"].get("Zone du filet (Kitchen)", 0) > total_events * 0.3:
         insights.append("Volume élevé d'échanges dans la zone du filet (Kitchen).")
 
-    if total_errors > 2:
+    if summary["total_errors"] > 2:
         insights.append("Nombre important d'erreurs non forcées potentiellement évitables.")
 
     if not insights:
         insights.append("Pas de vulnérabilité structurelle majeure détectée sur ce match (selon règles POC).")
 
-    summary["insights"] = insights
-
     # Priorité d'action simple
     if summary["transition_risk_ratio"] > 0.5:
-        summary["priority_level"] = "Élevée"
+        priority_level = "Élevée"
     elif summary["transition_risk_ratio"] > 0.3:
-        summary["priority_level"] = "Moyenne"
+        priority_level = "Moyenne"
     else:
-        summary["priority_level"] = "Faible"
+        priority_level = "Faible"
+
+    return {"insights": insights, "priority_level": priority_level}
+
+
+@dataclass
+class PatternAccumulator:
+    """
+    Compteurs additifs des patterns d'un match. Deux accumulateurs calculés sur des
+    morceaux indépendants (shards, journées de logs...) se combinent avec merge, de
+    façon associative ; ratios et synthèse ne sont dérivés qu'à la fin (summary).
+    """
+    total_events: int = 0
+    total_winners: int = 0
+    total_shots: int = 0
+    total_errors: int = 0
+    transition_events: int = 0
+    phase_counts: Counter = field(default_factory=Counter)
+    zone_counts: Counter = field(default_factory=Counter)
+
+    @classmethod
+    def from_events(cls, match_events: pd.DataFrame) -> "PatternAccumulator":
+        """Accumulateur des events d'un match (match_events n'est pas modifié)."""
+        encoded = encode_events(match_events)
+        type_counts = encoded["type"].value_counts()
+        zone_counts = encoded["zone"].value_counts()
+        return cls(
+            total_events=len(match_events),
+            total_winners=int(type_counts.get("WINNER", 0)),
+            total_shots=int(type_counts.get("SHOT", 0)),
+            total_errors=int(type_counts.get("ERROR", 0)),
+            transition_events=int((encoded["phase_key"] == "transition").sum()),
+            phase_counts=Counter({k: int(v) for k, v in match_events["phase"].value_counts().items() if v > 0}),
+            zone_counts=Counter({k: int(v) for k, v in zone_counts[zone_counts > 0].items()}),
+        )
+
+    def merge(self, other: "PatternAccumulator") -> "PatternAccumulator":
+        return PatternAccumulator(
+            total_events=self.total_events + other.total_events,
+            total_winners=self.total_winners + other.total_winners,
+            total_shots=self.total_shots + other.total_shots,
+            total_errors=self.total_errors + other.total_errors,
+            transition_events=self.transition_events + other.transition_events,
+            phase_counts=self.phase_counts + other.phase_counts,
+            zone_counts=self.zone_counts + other.zone_counts,
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        """Résumé final (même format que compute_match_patterns)."""
+        summary = {
+            "total_events": self.total_events,
+            "total_winners": self.total_winners,
+            "total_shots": self.total_shots,
+            "total_errors": self.total_errors,
+            # Distributions triées par effectif décroissant (comme value_counts)
+            "phase_distribution": dict(self.phase_counts.most_common()),
+            "zone_distribution": dict(self.zone_counts.most_common()),
+            "transition_risk_ratio": round(
+                self.transition_events / self.total_events, 2
+            ) if self.total_events > 0 else 0,
+        }
+        summary.update(_insights_and_priority(summary))
+        return summary
 
-    return summary
 
+def compute_match_patterns(match_events: pd.DataFrame) -> Dict[str, Any]:
+    """Analyse des patterns tactiques d'un match de pickleball (match_events n'est pas modifié)."""
+    return PatternAccumulator.from_events(match_events).summary()
+
+
+def accumulate_patterns(events: pd.DataFrame) -> Dict[Any, PatternAccumulator]:
+    """
+    Accumulateurs de tous les matchs présents dans events, en une passe : un seul
+    groupby sur match_id au lieu d'un découpage + copie par match.
+    """
+
+    encoded = encode_events(events)
+    keys = pd.DataFrame({
+        "match_id": events["match_id"],
+        "phase": events["phase"],
+        "zone": encoded["zone"],
+        "total_winners": encoded["type"] == "WINNER",
+        "total_shots": encoded["type"] == "SHOT",
+        "total_errors": encoded["type"] == "ERROR",
+        "transition_events": encoded["phase_key"] == "transition",
+    })
+
+    grouped = keys.groupby("match_id", sort=False)
+    counts = grouped[["total_winners", "total_shots", "total_errors", "transition_events"]].sum()
+    counts["total_events"] = grouped.size()
+
+    def distribution(column: str) -> Dict[Any, Counter]:
+        sizes = keys.groupby(["match_id", column], sort=False, observed=True).size()
+        result: Dict[Any, Counter] = {}
+        for (match_id, value), count in sizes.items():
+            result.setdefault(match_id, Counter())[value] = int(count)
+        return result
+
+    phases = distribution("phase")
+    zones = distribution("zone")
+
+    return {
+        match_id: PatternAccumulator(
+            total_events=int(row["total_events"]),
+            total_winners=int(row["total_winners"]),
+            total_shots=int(row["total_shots"]),
+            total_errors=int(row["total_errors"]),
+            transition_events=int(row["transition_events"]),
+            phase_counts=phases.get(match_id, Counter()),
+            zone_counts=zones.get(match_id, Counter()),
+        )
+        for match_id, row in counts.iterrows()
+    }
+
+
+def merge_accumulators(left: Dict[Any, PatternAccumulator],
+                       right: Dict[Any, PatternAccumulator]) -> Dict[Any, PatternAccumulator]:
+    """Combine deux résultats de accumulate_patterns (match par match)."""
+    merged = dict(left)
+    for match_id, accumulator in right.items():
+        merged[match_id] = merged[match_id].merge(accumulator) if match_id in merged else accumulator
+    return merged
+
+
+def compute_patterns_for_matches(events: pd.DataFrame) -> Dict[Any, Dict[str, Any]]:
+    """
+    Patterns de tous les matchs en une passe. Retourne {match_id: summary}, chaque
+    summary ayant le même contenu que compute_match_patterns sur les events du match.
+    """
+    return {match_id: acc.summary() for match_id, acc in accumulate_patterns(events).items()}
+
+
+def _accumulate_shard(shard: Union[pd.DataFrame, str, Path]) -> Dict[Any, PatternAccumulator]:
+    """Tâche d'un worker : un shard (DataFrame ou chemin CSV) -> accumulateurs par match."""
+    if not isinstance(shard, pd.DataFrame):
+        shard = pd.read_csv(shard)
+    return accumulate_patterns(shard)
+
+
+def compute_patterns_parallel(shards: Iterable[Union[pd.DataFrame, str, Path]],
+                              max_workers: Optional[int] = None) -> Dict[Any, Dict[str, Any]]:
+    """
+    Map-reduce des patterns sur un pool de processus : chaque shard d'events (DataFrame
+    ou fichier CSV, lu dans le worker) est accumulé indépendamment, puis les résultats
+    partiels sont fusionnés. Un match peut être réparti sur plusieurs shards.
+    Retourne {match_id: summary}, identique à compute_patterns_for_matches sur
+    la concaténation des shards.
+    """
+    merged: Dict[Any, PatternAccumulator] = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for partial in pool.map(_accumulate_shard, shards):
+            merged = merge_accumulators(merged, partial)
+    return {match_id: acc.summary() for match_id, acc in merged.items()}
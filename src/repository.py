@@ -0,0 +1,250 @@
+import sqlite3
+import warnings
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+import pandas as pd
+
+from src.config import DATA_DIR, DB_PATH
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id   INTEGER PRIMARY KEY,
+    title     TEXT NOT NULL,
+    sport     TEXT NOT NULL,
+    date      TEXT NOT NULL,
+    duration  TEXT,
+    status    TEXT NOT NULL,
+    rating    REAL,
+    rallies   INTEGER,
+    winners   INTEGER,
+    errors    INTEGER,
+    coverage  INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_games_sport_date ON games (sport, date);
+CREATE INDEX IF NOT EXISTS idx_games_date ON games (date);
+
+CREATE TABLE IF NOT EXISTS events (
+    event_id  INTEGER PRIMARY KEY AUTOINCREMENT,
+    match_id  INTEGER NOT NULL,
+    type      TEXT NOT NULL,
+    phase     TEXT,
+    x         REAL,
+    y         REAL,
+    minute    INTEGER,
+    source    TEXT NOT NULL DEFAULT 'csv'
+);
+CREATE INDEX IF NOT EXISTS idx_events_match_minute ON events (match_id, minute);
+CREATE INDEX IF NOT EXISTS idx_events_minute ON events (minute);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+GAME_COLUMNS = ["game_id", "title", "sport", "date", "duration", "status",
+                "rating", "rallies", "winners", "errors", "coverage"]
+EVENT_COLUMNS = ["match_id", "type", "phase", "x", "y", "minute"]
+
+GAME_DTYPES = {"game_id": "int64", "rating": "float64", "rallies": "int64",
+               "winners": "int64", "errors": "int64", "coverage": "int64"}
+EVENT_DTYPES = {"match_id": "int64", "x": "float64", "y": "float64", "minute": "int64"}
+
+# Colonnes NOT NULL de la table games
+REQUIRED_GAME_COLUMNS = ["title", "sport", "date", "status"]
+
+# Origine des events : les CSV de démo (remplacés à chaque ré-import) ou un export ingéré (conservé)
+CSV_SOURCE = "csv"
+INGEST_SOURCE = "ingest"
+
+
+def validate_games(games: pd.DataFrame) -> None:
+    """
+    Vérifie la table des matchs avant import : game_id entier et unique, champs
+    obligatoires renseignés. ValueError listant les lignes fautives (numéros de
+    ligne du CSV, en-tête = ligne 1).
+    """
+    problems = []
+    game_id = pd.to_numeric(games["game_id"], errors="coerce")
+    invalid = game_id.isna() | (game_id % 1 != 0)
+    problems += [(i, f"game_id invalide ({games['game_id'].iloc[i]!r})") for i in invalid.to_numpy().nonzero()[0]]
+    duplicated = game_id.duplicated(keep=False) & ~invalid
+    problems += [(i, f"game_id {int(game_id.iloc[i])} en double") for i in duplicated.to_numpy().nonzero()[0]]
+    for column in REQUIRED_GAME_COLUMNS:
+        missing = games[column].isna() | (games[column].astype(str).str.strip() == "")
+        problems += [(i, f"{column} manquant") for i in missing.to_numpy().nonzero()[0]]
+    if problems:
+        raise ValueError("Table des matchs invalide, import annulé :\n"
+                         + "\n".join(f"ligne {i + 2} : {problem}" for i, problem in sorted(problems)))
+
+
+# Signatures de CSV déjà refusées par validate_games (pas de nouvel essai tant qu'ils ne changent pas)
+_rejected_signatures = set()
+
+
+class Repository:
+    """
+    Accès aux matchs et events via une base SQLite locale indexée (game_id, match_id,
+    sport, date, minute) : une requête sur un match ne parcourt que ses lignes.
+    """
+
+    def __init__(self, path: Path = DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            # Base créée avant la colonne source : ses events sont ceux des CSV
+            if "source" not in [row[1] for row in conn.execute("PRAGMA table_info(events)")]:
+                conn.execute(f"ALTER TABLE events ADD COLUMN source TEXT NOT NULL DEFAULT '{CSV_SOURCE}'")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Une connexion par opération : sûr avec les threads de script Streamlit
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _query(self, sql: str, params: tuple = (), dtypes: Optional[dict] = None) -> pd.DataFrame:
+        with self._connect() as conn:
+            df = pd.read_sql_query(sql, conn, params=params)
+        return df.astype(dtypes) if dtypes and len(df) else df
+
+    # ── Import ─────────────────────────────────────────────────────────
+
+    def import_csvs(self, games_csv: Path = DATA_DIR / "demo_games.csv",
+                    events_csv: Path = DATA_DIR / "demo_events.csv") -> None:
+        """
+        Import (ou ré-import) des CSV existants dans la base. Seuls les events issus
+        des CSV sont remplacés : les events ingérés (python -m src.ingestion) sont gardés.
+        ValueError (voir validate_games) si la table des matchs est invalide : la base
+        n'est alors pas modifiée.
+        """
+        games = pd.read_csv(games_csv)[GAME_COLUMNS]
+        validate_games(games)
+        events = pd.read_csv(events_csv)[EVENT_COLUMNS] if Path(events_csv).exists() else None
+
+        with self._connect() as conn:
+            conn.execute("DELETE FROM games")
+            conn.executemany(
+                f"INSERT INTO games ({', '.join(GAME_COLUMNS)}) VALUES ({', '.join('?' * len(GAME_COLUMNS))})",
+                games.astype(object).where(games.notna(), None).itertuples(index=False, name=None),
+            )
+            if events is not None:
+                conn.execute("DELETE FROM events WHERE source = ?", (CSV_SOURCE,))
+                self._insert_events(conn, events, CSV_SOURCE)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('imported_from', ?)", (str(games_csv),))
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('csv_signature', ?)",
+                         (self._csv_signature(games_csv, events_csv),))
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('import_id', "
+                         "COALESCE((SELECT CAST(value AS INTEGER) FROM meta WHERE key = 'import_id'), 0) + 1)")
+
+    @staticmethod
+    def _csv_signature(games_csv: Path, events_csv: Path) -> str:
+        """Empreinte (mtime, taille) des CSV sources, pour détecter leur modification."""
+        parts = []
+        for path in (Path(games_csv), Path(events_csv)):
+            stat = path.stat() if path.exists() else None
+            parts.append(f"{stat.st_mtime_ns}:{stat.st_size}" if stat else "-")
+        return "|".join(parts)
+
+    def _meta(self, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def import_id(self) -> int:
+        """Numéro du dernier import (change à chaque ré-import des CSV)."""
+        return int(self._meta("import_id") or 0)
+
+    def sync_csvs(self, games_csv: Path = DATA_DIR / "demo_games.csv",
+                  events_csv: Path = DATA_DIR / "demo_events.csv") -> bool:
+        """
+        Ré-importe les CSV s'ils ont changé sur disque depuis le dernier import. Des CSV
+        invalides ne cassent pas une base déjà remplie : le dernier import valide reste
+        servi (avertissement) jusqu'à la prochaine modification des fichiers.
+        """
+        signature = self._csv_signature(games_csv, events_csv)
+        if self._meta("csv_signature") == signature or signature in _rejected_signatures:
+            return False
+        try:
+            self.import_csvs(games_csv, events_csv)
+        except ValueError as e:
+            if self.is_empty():
+                raise
+            _rejected_signatures.add(signature)
+            warnings.warn(f"{e}\nLe dernier import valide reste utilisé.")
+            return False
+        return True
+
+    @staticmethod
+    def _insert_events(conn: sqlite3.Connection, events: pd.DataFrame, source: str) -> None:
+        rows = events[EVENT_COLUMNS].astype(object).where(events[EVENT_COLUMNS].notna(), None)
+        conn.executemany(
+            f"INSERT INTO events ({', '.join(EVENT_COLUMNS)}, source) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (row + (source,) for row in rows.itertuples(index=False, name=None)),
+        )
+
+    def append_events(self, events: pd.DataFrame, source: str = INGEST_SOURCE) -> None:
+        """Ajoute des events (un lot, une transaction) sans toucher aux existants."""
+        with self._connect() as conn:
+            self._insert_events(conn, events, source)
+
+    def is_empty(self) -> bool:
+        with self._connect() as conn:
+            return conn.execute("SELECT NOT EXISTS (SELECT 1 FROM games)").fetchone()[0] == 1
+
+    # ── Matchs ─────────────────────────────────────────────────────────
+
+    def games(self, sport: Optional[str] = None) -> pd.DataFrame:
+        """Tous les matchs (optionnellement d'un sport), du plus récent au plus ancien."""
+        if sport is None:
+            return self._query("SELECT * FROM games ORDER BY date DESC", dtypes=GAME_DTYPES)
+        return self._query("SELECT * FROM games WHERE sport = ? ORDER BY date DESC", (sport,), GAME_DTYPES)
+
+    def games_page(self, limit: int = 20, offset: int = 0, sport: Optional[str] = None) -> pd.DataFrame:
+        """Une page de la liste des matchs (tri par date décroissante)."""
+        if sport is None:
+            return self._query("SELECT * FROM games ORDER BY date DESC LIMIT ? OFFSET ?",
+                               (limit, offset), GAME_DTYPES)
+        return self._query("SELECT * FROM games WHERE sport = ? ORDER BY date DESC LIMIT ? OFFSET ?",
+                           (sport, limit, offset), GAME_DTYPES)
+
+    def game(self, game_id: int) -> Optional[dict]:
+        df = self._query("SELECT * FROM games WHERE game_id = ?", (int(game_id),), GAME_DTYPES)
+        return df.iloc[0].to_dict() if len(df) else None
+
+    def games_between(self, start_date: str, end_date: str) -> pd.DataFrame:
+        """Matchs joués entre deux dates (format ISO, bornes incluses)."""
+        return self._query("SELECT * FROM games WHERE date BETWEEN ? AND ? ORDER BY date DESC",
+                           (start_date, end_date), GAME_DTYPES)
+
+    # ── Events ─────────────────────────────────────────────────────────
+
+    def events(self) -> pd.DataFrame:
+        """Tous les events (ordre d'insertion)."""
+        return self._query(f"SELECT {', '.join(EVENT_COLUMNS)} FROM events ORDER BY event_id", dtypes=EVENT_DTYPES)
+
+    def events_for_match(self, match_id: int) -> pd.DataFrame:
+        """Events d'un match (lecture via l'index match_id, indépendante de la taille de l'historique)."""
+        return self._query(f"SELECT {', '.join(EVENT_COLUMNS)} FROM events WHERE match_id = ? ORDER BY event_id",
+                           (int(match_id),), EVENT_DTYPES)
+
+    def events_in_range(self, start_minute: int, end_minute: int, match_id: Optional[int] = None) -> pd.DataFrame:
+        """Events dont la minute est dans [start_minute, end_minute], d'un match ou de tous."""
+        if match_id is None:
+            return self._query(f"SELECT {', '.join(EVENT_COLUMNS)} FROM events WHERE minute BETWEEN ? AND ? "
+                               "ORDER BY match_id, minute", (int(start_minute), int(end_minute)), EVENT_DTYPES)
+        return self._query(f"SELECT {', '.join(EVENT_COLUMNS)} FROM events WHERE match_id = ? AND minute BETWEEN ? AND ? "
+                           "ORDER BY minute", (int(match_id), int(start_minute), int(end_minute)), EVENT_DTYPES)
+
+
+def get_repository(path: Path = DB_PATH) -> Repository:
+    """Repository prêt à l'emploi : la base est créée et (ré)importée depuis les CSV si besoin."""
+    repo = Repository(path)
+    repo.sync_csvs()
+    return repo
@@ -0,0 +1,197 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+
+# Textes des explications (gabarits formatés avec minute et zone)
+EXPLANATIONS: Dict[str, str] = {
+    "winner": "Point gagné analysé autour de la {minute}e minute, dans la {zone}.",
+    "winner_transition": "Le contexte indique une phase de transition vers le filet, souvent liée à une prise d'initiative bien préparée.",
+    "winner_service": "Le point intervient sur le service, la structure et le placement de retour priment.",
+    "winner_filet": "L'action se termine très près du filet, ce qui traduit une bonne prise de temps en Kitchen.",
+    "winner_erreur_recente": "Une erreur non forcée récente est détectée avant ce point, ce qui augmente le risque d'instabilité.",
+    "error": "Erreur non forcée à la {minute}e minute dans la {zone}.",
+    "error_transition": "L'erreur intervient dans une phase instable, le binôme est potentiellement mal synchronisé.",
+    "error_zone_avancee": "L'erreur se situe en zone avancée, ce qui expose le point suivant à l'adversaire.",
+    "shot": "Coup joué à la {minute}e minute dans la {zone}.",
+    "shot_transition": "Coup joué en transition, signe d'une prise d'initiative avant la stabilisation au filet.",
+    "shot_filet": "Coup joué près du filet, possible retard dans la préparation du dink ou du volley.",
+    "evenement_generique": "Événement analysé, règles v1 appliquées.",
+}
+
+# Recommandations identifiées par un code stable
+RECOMMENDATIONS: Dict[str, str] = {
+    "montee_binome": "Reproduire ce schéma de montée au filet en binôme lors des prochains points.",
+    "synchro_transition": "Continuer à synchroniser les déplacements avec le partenaire lors de la transition.",
+    "revoir_service": "Revoir le placement de service et la stratégie de retour pour reproduire ce point.",
+    "patience_dinks": "Continuer à travailler la patience dans les échanges de dinks avant l'attaque.",
+    "gestion_risque": "Améliorer la gestion du risque et la constance dans les échanges sous pression.",
+    "risque_transition": "Limiter les prises de risque pendant la transition vers le filet.",
+    "signal_partenaire": "Mettre en place un signal clair avec le partenaire pour la montée au filet.",
+    "securiser_echange": "Sécuriser l'échange avec un coup plus prudent avant de tenter l'attaque.",
+    "timing_montee": "Travailler le timing de la montée au filet après le service ou le retour.",
+    "preparation_filet": "Améliorer la préparation de la raquette avant les échanges au filet.",
+    "plus_de_contexte": "Collecter plus de contexte ou annoter l’action pour améliorer l’explication.",
+}
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    Une ligne de table de règles : prédicats (tous optionnels sauf le type) et deltas.
+    Bornes x/y : min inclusif, max exclusif.
+    recent : (type, fenêtre en minutes, nombre minimum) d'events récents du même match.
+    confidence : niveau de confiance porté par la règle de base d'un type d'event.
+    """
+    event_type: str
+    phase: Optional[str] = None
+    x_min: Optional[float] = None
+    x_max: Optional[float] = None
+    y_min: Optional[float] = None
+    y_max: Optional[float] = None
+    recent: Optional[Tuple[str, float, int]] = None
+    individual: int = 0
+    collective: int = 0
+    tactical: int = 0
+    explanation: Optional[str] = None
+    recommendations: Tuple[str, ...] = ()
+    confidence: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """Table de règles d'un sport, évaluée dans l'ordre (ordre des explications)."""
+    sport: str
+    rules: Tuple[Rule, ...]
+    base: Tuple[int, int, int] = (33, 34, 33)
+    fallback_explanation: str = "evenement_generique"
+    fallback_recommendation: str = "plus_de_contexte"
+    fallback_confidence: str = "Faible"
+
+
+PICKLEBALL_RULES = RuleSet(
+    sport="pickleball",
+    rules=(
+        Rule("WINNER", explanation="winner", confidence="Élevée"),
+        Rule("WINNER", phase="transition", individual=-5, collective=12, tactical=8,
+             explanation="winner_transition", recommendations=("montee_binome", "synchro_transition")),
+        Rule("WINNER", phase="service", individual=-5, collective=5, tactical=15,
+             explanation="winner_service", recommendations=("revoir_service",)),
+        Rule("WINNER", x_min=85, individual=6,
+             explanation="winner_filet", recommendations=("patience_dinks",)),
+        Rule("WINNER", recent=("ERROR", 5, 1), collective=6,
+             explanation="winner_erreur_recente", recommendations=("gestion_risque",)),
+
+        Rule("ERROR", individual=12, collective=6, tactical=-6, explanation="error", confidence="Moyenne"),
+        Rule("ERROR", phase="transition", collective=6,
+             explanation="error_transition", recommendations=("risque_transition", "signal_partenaire")),
+        Rule("ERROR", x_min=55, collective=4,
+             explanation="error_zone_avancee", recommendations=("securiser_echange",)),
+
+        Rule("SHOT", individual=-2, collective=8, tactical=4, explanation="shot", confidence="Faible"),
+        Rule("SHOT", phase="transition", collective=6,
+             explanation="shot_transition", recommendations=("timing_montee",)),
+        Rule("SHOT", x_min=80, individual=4,
+             explanation="shot_filet", recommendations=("preparation_filet",)),
+    ),
+)
+
+# Tables par sport (football et padel : à ajouter ici, sans nouveau code d'évaluation)
+RULE_TABLES: Dict[str, RuleSet] = {
+    "pickleball": PICKLEBALL_RULES,
+}
+
+
+def _clamp_100_vec(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Ramène chaque triplet à un total de 100 (même arrondi bancaire que round())."""
+    total = a + b + c
+    safe_total = np.where(total == 0, 1, total)
+    a2 = np.rint(a * 100 / safe_total).astype(int)
+    b2 = np.rint(b * 100 / safe_total).astype(int)
+    c2 = 100 - a2 - b2
+
+    keep = total == 100
+    empty = total == 0
+    a = np.where(keep, a, np.where(empty, 34, a2))
+    b = np.where(keep, b, np.where(empty, 33, b2))
+    c = np.where(keep, c, np.where(empty, 33, c2))
+    return a, b, c
+
+
+def _join_codes(matches: np.ndarray, codes_per_rule: List[Tuple[str, ...]], fallback: str) -> List[List[str]]:
+    """Liste ordonnée des codes des règles déclenchées, pour chaque event."""
+    joined = np.full(matches.shape[0], "", dtype=object)
+    for j, codes in enumerate(codes_per_rule):
+        if codes:
+            joined = np.where(matches[:, j], joined + ",".join(codes) + ",", joined)
+    return [c.rstrip(",").split(",") if c else [fallback] for c in joined]
+
+
+class CompiledRuleSet:
+    """
+    Évaluateur vectorisé d'une RuleSet : les prédicats sont des tableaux (une colonne
+    par règle) comparés en bloc aux events, et les deltas sont sommés par produit
+    matriciel. Fonctionne aussi bien pour un event (tableaux de taille 1) que pour
+    un match ou une saison entière.
+    """
+
+    def __init__(self, rule_set: RuleSet):
+        rules = rule_set.rules
+        self.rule_set = rule_set
+
+        self._types = np.array([r.event_type.upper() for r in rules], dtype=object)
+        self._phases = np.array([(r.phase or "").lower() for r in rules], dtype=object)
+        self._any_phase = np.array([r.phase is None for r in rules])
+        self._x_min = np.array([-np.inf if r.x_min is None else r.x_min for r in rules], dtype=float)
+        self._x_max = np.array([np.inf if r.x_max is None else r.x_max for r in rules], dtype=float)
+        self._y_min = np.array([-np.inf if r.y_min is None else r.y_min for r in rules], dtype=float)
+        self._y_max = np.array([np.inf if r.y_max is None else r.y_max for r in rules], dtype=float)
+        self._deltas = np.array([[r.individual, r.collective, r.tactical] for r in rules], dtype=int).reshape(-1, 3)
+        self._confidences = np.array([r.confidence or "" for r in rules], dtype=object)
+        self._explanations = [(r.explanation,) if r.explanation else () for r in rules]
+        self._recommendations = [r.recommendations for r in rules]
+        self._recent = [(j, r.recent) for j, r in enumerate(rules) if r.recent]
+
+        # Types d'events à indexer dans le temps pour les prédicats "recent"
+        self.recent_types = sorted({recent[0].upper() for _, recent in self._recent})
+
+    def evaluate(self, event_type: np.ndarray, phase: np.ndarray, x: np.ndarray, y: np.ndarray,
+                 count_recent: Callable[[str, float], np.ndarray]) -> Dict[str, object]:
+        """
+        event_type (majuscules), phase (minuscules), x, y : un tableau par colonne.
+        count_recent(type, fenêtre) : nombre d'events récents de ce type pour chaque
+        event ; n'est appelé que si une règle "recent" peut s'appliquer.
+        """
+        matches = (
+            (event_type[:, None] == self._types[None, :])
+            & (self._any_phase[None, :] | (phase[:, None] == self._phases[None, :]))
+            & (x[:, None] >= self._x_min[None, :]) & (x[:, None] < self._x_max[None, :])
+            & (y[:, None] >= self._y_min[None, :]) & (y[:, None] < self._y_max[None, :])
+        )
+
+        for j, (recent_type, window, minimum) in self._recent:
+            if matches[:, j].any():
+                matches[:, j] &= count_recent(recent_type.upper(), window) >= minimum
+
+        scores = np.asarray(self.rule_set.base) + matches.astype(int) @ self._deltas
+        individual, collective, tactical = _clamp_100_vec(scores[:, 0], scores[:, 1], scores[:, 2])
+
+        # Confiance : celle de la première règle déclenchée qui en porte une
+        has_confidence = matches & (self._confidences != "")[None, :]
+        first = has_confidence.argmax(axis=1)
+        confidence = np.where(has_confidence.any(axis=1), self._confidences[first], self.rule_set.fallback_confidence)
+
+        return {
+            "individual": individual,
+            "collective": collective,
+            "tactical": tactical,
+            "confidence": confidence,
+            "explanation_codes": _join_codes(matches, self._explanations, self.rule_set.fallback_explanation),
+            "recommendation_codes": _join_codes(matches, self._recommendations, self.rule_set.fallback_recommendation),
+        }
+
+
+# Compilées une seule fois, à l'import
+COMPILED_RULES: Dict[str, CompiledRuleSet] = {
+    sport: CompiledRuleSet(rule_set) for sport, rule_set in RULE_TABLES.items()
+}
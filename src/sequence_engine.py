@@ -0,0 +1,152 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+import numpy as np
+import pandas as pd
+
+from src.encoding import encode_phases, encode_types
+
+
+@dataclass
+class SequencePattern:
+    """Séquence d'events consécutifs (ex. SHOT/transition -> ERROR/transition)."""
+    sequence: Tuple[str, ...]
+    count: int
+    support: float
+    lift: float
+    matches: int
+
+    @property
+    def label(self) -> str:
+        return " → ".join(self.sequence)
+
+
+@dataclass
+class _Tokens:
+    match_codes: np.ndarray
+    match_ids: pd.Index
+    tokens: np.ndarray
+    labels: List[str]
+
+
+def _tokenize(events: pd.DataFrame) -> _Tokens:
+    """
+    Events triés par match puis par minute (ordre du fichier conservé à minute égale)
+    et encodés en un code de token TYPE/phase.
+    """
+    if "match_id" in events.columns:
+        match_codes, match_ids = pd.factorize(events["match_id"])
+    else:
+        match_codes, match_ids = np.zeros(len(events), dtype=np.int64), pd.Index([0])
+    order = np.lexsort((events["minute"].to_numpy(), match_codes))
+
+    types = encode_types(events["type"])
+    phases = encode_phases(events["phase"])
+    type_codes = types.codes.astype(np.int64)[order]
+    phase_codes = phases.codes.astype(np.int64)[order]
+    n_phases = len(phases.categories) + 1
+
+    # Code de phase 0 réservé aux phases manquantes (libellé sans phase)
+    labels = [f"{t}/{p}" if p else str(t) for t in types.categories for p in ["", *phases.categories]]
+    known = type_codes >= 0
+    return _Tokens(
+        match_codes=match_codes.astype(np.int64)[order][known],
+        match_ids=pd.Index(match_ids),
+        tokens=(type_codes * n_phases + phase_codes + 1)[known],
+        labels=labels,
+    )
+
+
+def _ngrams(tok: _Tokens, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Identifiant entier (base nombre de tokens) de chaque n-gramme interne à un match, et son match."""
+    size = len(tok.tokens) - n + 1
+    if size <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    same_match = tok.match_codes[:size] == tok.match_codes[n - 1:]
+    ids = np.zeros(size, dtype=np.int64)
+    for k in range(n):
+        ids = ids * len(tok.labels) + tok.tokens[k:k + size]
+    return ids[same_match], tok.match_codes[:size][same_match]
+
+
+def _decode(ngram_id: int, n_tokens: int, n: int) -> Tuple[int, ...]:
+    codes = []
+    for _ in range(n):
+        ngram_id, token = divmod(ngram_id, n_tokens)
+        codes.append(token)
+    return tuple(reversed(codes))
+
+
+def _pattern(tok: _Tokens, ngram_id: int, n: int, count: int, total: int,
+             token_freq: np.ndarray, matches: int) -> SequencePattern:
+    codes = _decode(ngram_id, len(tok.labels), n)
+    support = count / total
+    expected = float(np.prod(token_freq[list(codes)]))
+    return SequencePattern(
+        sequence=tuple(tok.labels[c] for c in codes),
+        count=count,
+        support=support,
+        lift=support / expected if expected else 0.0,
+        matches=matches,
+    )
+
+
+def _rank(patterns: List[SequencePattern]) -> List[SequencePattern]:
+    return sorted(patterns, key=lambda p: (-p.count * p.lift, -p.count, p.sequence))
+
+
+def mine_sequences(events: pd.DataFrame, n: int = 2, min_count: int = 2) -> List[SequencePattern]:
+    """
+    N-grammes d'events fréquents sur l'ensemble des matchs (une séquence ne franchit
+    jamais la frontière entre deux matchs), comptés en une passe vectorisée.
+    support : part du n-gramme parmi tous les n-grammes
+    lift : support / produit des fréquences des events qui le composent
+           (> 1 : la séquence revient plus souvent que par hasard)
+    matches : nombre de matchs où la séquence apparaît
+    """
+    tok = _tokenize(events)
+    ids, id_matches = _ngrams(tok, n)
+    if len(ids) == 0:
+        return []
+
+    token_freq = np.bincount(tok.tokens, minlength=len(tok.labels)) / len(tok.tokens)
+    uniques, counts = np.unique(ids, return_counts=True)
+
+    # Nombre de matchs distincts par n-gramme (mêmes identifiants triés que uniques)
+    pairs = np.unique(np.stack([ids, id_matches], axis=1), axis=0)
+    _, match_counts = np.unique(pairs[:, 0], return_counts=True)
+
+    return _rank([
+        _pattern(tok, int(ngram_id), n, int(count), len(ids), token_freq, int(matches))
+        for ngram_id, count, matches in zip(uniques, counts, match_counts)
+        if count >= min_count
+    ])
+
+
+def mine_sequences_by_match(events: pd.DataFrame, n: int = 2, min_count: int = 2) -> Dict[Any, List[SequencePattern]]:
+    """Même minage, statistiques calculées match par match : {match_id: [SequencePattern]}."""
+    tok = _tokenize(events)
+    ids, id_matches = _ngrams(tok, n)
+    n_tokens = len(tok.labels)
+    n_matches = len(tok.match_ids)
+
+    token_counts = np.bincount(tok.match_codes * n_tokens + tok.tokens, minlength=n_matches * n_tokens)
+    token_counts = token_counts.reshape(n_matches, n_tokens)
+    token_freq = token_counts / np.maximum(token_counts.sum(axis=1, keepdims=True), 1)
+    totals = np.bincount(id_matches, minlength=n_matches)
+
+    pairs, counts = np.unique(np.stack([id_matches, ids], axis=1), axis=0, return_counts=True)
+
+    result: Dict[Any, List[SequencePattern]] = {match_id: [] for match_id in tok.match_ids}
+    for (m, ngram_id), count in zip(pairs.tolist(), counts.tolist()):
+        if count >= min_count:
+            result[tok.match_ids[m]].append(_pattern(tok, ngram_id, n, count, int(totals[m]), token_freq[m], 1))
+    return {match_id: _rank(patterns) for match_id, patterns in result.items()}
+
+
+def sequence_insights(patterns: List[SequencePattern], top: int = 3, min_lift: float = 1.0) -> List[str]:
+    """Insights textuels des séquences les plus significatives (plus fréquentes que le hasard)."""
+    return [
+        f"Séquence récurrente : {p.label} ({p.count} fois, lift {p.lift:.1f})."
+        for p in patterns
+        if p.lift > min_lift
+    ][:top]
@@ -0,0 +1,92 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+import numpy as np
+import pandas as pd
+
+from src.encoding import encode_types
+
+
+# Nombre de cases par axe sur le terrain normalisé [0, 100] x [0, 100]
+GRID_BINS = 20
+
+
+@dataclass
+class HeatmapGrid:
+    """
+    Grilles de densité spatiale par type d'event : counts[type][iy, ix] = nombre
+    d'events dans la case (lignes = y, colonnes = x). Additives : deux grilles de
+    même résolution se combinent avec merge (plusieurs matchs, une saison...).
+    """
+    bins: int = GRID_BINS
+    counts: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def merge(self, other: "HeatmapGrid") -> "HeatmapGrid":
+        if other.bins != self.bins:
+            raise ValueError(f"Résolutions incompatibles : {self.bins} et {other.bins}")
+        counts = {t: grid.copy() for t, grid in self.counts.items()}
+        for t, grid in other.counts.items():
+            counts[t] = counts[t] + grid if t in counts else grid.copy()
+        return HeatmapGrid(self.bins, counts)
+
+    def grid(self, event_type: Optional[str] = None) -> np.ndarray:
+        """Comptes d'un type (ou de tous les types si event_type est None)."""
+        if event_type is not None:
+            return self.counts.get(event_type.upper(), np.zeros((self.bins, self.bins), dtype=np.int64))
+        total = np.zeros((self.bins, self.bins), dtype=np.int64)
+        for grid in self.counts.values():
+            total = total + grid
+        return total
+
+    def density(self, event_type: Optional[str] = None) -> np.ndarray:
+        """Part des events dans chaque case (somme = 1, ou grille nulle si vide)."""
+        grid = self.grid(event_type)
+        total = grid.sum()
+        return grid / total if total else grid.astype(float)
+
+
+def _cells(events: pd.DataFrame, bins: int) -> pd.DataFrame:
+    """Index de case (plat), type encodé et match des events ayant une position x/y valide."""
+    x = events["x"].to_numpy(dtype=float)
+    y = events["y"].to_numpy(dtype=float)
+    valid = ~(np.isnan(x) | np.isnan(y))
+
+    # x = 100 (au filet) tombe dans la dernière case
+    ix = np.clip((x[valid] * bins / 100).astype(int), 0, bins - 1)
+    iy = np.clip((y[valid] * bins / 100).astype(int), 0, bins - 1)
+    cells = pd.DataFrame({"cell": iy * bins + ix, "type": encode_types(events["type"][valid])})
+    if "match_id" in events.columns:
+        cells["match_id"] = events["match_id"].to_numpy()[valid]
+    return cells
+
+
+def compute_heatmap_grid(match_events: pd.DataFrame, bins: int = GRID_BINS) -> HeatmapGrid:
+    """Grilles de densité d'un match, en un binning vectorisé (np.bincount par type)."""
+    cells = _cells(match_events, bins)
+    codes = cells["type"].cat.codes.to_numpy().astype(np.int64)
+    categories = cells["type"].cat.categories
+
+    flat = np.bincount(
+        codes[codes >= 0] * bins * bins + cells["cell"].to_numpy()[codes >= 0],
+        minlength=len(categories) * bins * bins,
+    ).reshape(len(categories), bins, bins)
+    return HeatmapGrid(bins, {str(t): flat[i] for i, t in enumerate(categories) if flat[i].any()})
+
+
+def compute_heatmap_grids(events: pd.DataFrame, bins: int = GRID_BINS) -> Dict[Any, HeatmapGrid]:
+    """Grilles de tous les matchs en une passe : {match_id: HeatmapGrid}."""
+    cells = _cells(events, bins)
+    match_codes, match_ids = pd.factorize(cells["match_id"])
+    type_codes = cells["type"].cat.codes.to_numpy().astype(np.int64)
+    categories = cells["type"].cat.categories
+    n_types = len(categories)
+
+    known = type_codes >= 0
+    flat = np.bincount(
+        (match_codes[known] * n_types + type_codes[known]) * bins * bins + cells["cell"].to_numpy()[known],
+        minlength=len(match_ids) * n_types * bins * bins,
+    ).reshape(len(match_ids), n_types, bins, bins)
+
+    return {
+        match_id: HeatmapGrid(bins, {str(t): flat[m, i] for i, t in enumerate(categories) if flat[m, i].any()})
+        for m, match_id in enumerate(match_ids)
+    }
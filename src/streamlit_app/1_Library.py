@@ -5,17 +5,21 @@ import sys
 
 ROOT = Path(__file__).resolve().parent
 sys.path.append(str(ROOT))
-from src.design import set_ios_design, page_header, section_title, skill_bar, performance_ring, kpi_grid, strengths_focus
-from src.config import DATA_DIR
+from src.design import set_ios_design, page_header, section_title, skill_bar, performance_ring, kpi_grid, strengths_focus, job_progress
+from src.config import JOB_POLL_SECONDS
+from src.data_access import get_games
+from src.jobs import JobQueue, submit_analysis
 
 set_ios_design()
 page_header("Library", "Your analyzed games")
 
-@st.cache_data
-def load_games():
-    return pd.read_csv(DATA_DIR / "demo_games.csv")
+games = get_games()
+queue = JobQueue()
 
-games = load_games()
+@st.fragment(run_every=max(JOB_POLL_SECONDS, 1.0) * 2)
+def analysis_status(game_id):
+    # Rafraîchi seul (sans rerun de la page) pendant que les workers avancent
+    job_progress(queue.jobs_for_game(game_id))
 
 # ── Game list ───────────────────────────────────────────────────────
 for _, g in games.iterrows():
@@ -52,8 +56,10 @@ for _, g in games.iterrows():
             st.rerun()
     else:
         if st.button(f"🔍 Analyze Game — {g['title']}", key=f"analyze_{g['game_id']}", use_container_width=True):
-            with st.spinner("Analyzing..."):
-                import time; time.sleep(2)
-            st.success("Analysis complete!")
+            submit_analysis(int(g["game_id"]), g["sport"])
+            st.toast(f"Analysis queued — {g['title']}")
+
+    if queue.jobs_for_game(int(g["game_id"])):
+        analysis_status(int(g["game_id"]))
 
     st.markdown("<hr>", unsafe_allow_html=True)
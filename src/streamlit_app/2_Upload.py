@@ -1,12 +1,15 @@
 import streamlit as st
-import time
+from dataclasses import replace
 from pathlib import Path
 import sys
-from datetime import datetime
 
 ROOT = Path(__file__).resolve().parent
 sys.path.append(str(ROOT))
-from src.design import set_ios_design, page_header, section_title
+from src.design import set_ios_design, page_header, section_title, job_progress
+from src.config import JOB_POLL_SECONDS
+from src.uploads import get_video_store
+from src.data_access import get_games
+from src.jobs import JobQueue, submit_analysis
 
 set_ios_design()
 page_header("Upload", "Recording Pickleball 🏓")
@@ -49,44 +52,81 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 if uploaded is not None:
-    # Save video
-    VIDEO_DIR = ROOT / "data" / "videos"
-    VIDEO_DIR.mkdir(parents=True, exist_ok=True)
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    save_path = VIDEO_DIR / f"{ts}_{uploaded.name.replace(' ', '_')}"
-    with open(save_path, "wb") as f:
-        f.write(uploaded.getbuffer())
-    st.session_state["last_uploaded_video"] = str(save_path)
+    # Match auquel la vidéo est rattachée (le Dashboard la retrouve via l'index des vidéos)
+    games = get_games()
+    game_ids = games["game_id"].tolist()
+    saved = st.session_state.setdefault("saved_uploads", {})
+    result = saved.get(uploaded.file_id)
+    current_id = result.game_id if result is not None else st.session_state.get("current_game_id")
+    game_id = st.selectbox("Link to game", game_ids, index=game_ids.index(current_id) if current_id in game_ids else 0,
+                           format_func=lambda gid: games.loc[games["game_id"] == gid, "title"].iloc[0],
+                           key="upload_game_select")
 
-    # Confirmation modal style
-    st.markdown("""
-    <div class="nm-card" style="text-align:center;border:2px solid #34C759;padding:24px;">
-      <div style="font-size:32px;margin-bottom:8px;">✅</div>
-      <div style="font-size:17px;font-weight:600;color:#1C1C1E;">Video Imported!</div>
-      <div style="font-size:14px;color:#8E8E93;margin-top:4px;">
-        Your video has been imported. Go to the Library tab to view and analyze it.
-      </div>
-    </div>
-    """, unsafe_allow_html=True)
+    # Enregistrement seulement sur confirmation : changer de match dans la liste n'écrit rien
+    linked = result is not None and result.game_id == int(game_id)
+    if st.button("🔗 Link video to this game", use_container_width=True, type="primary", disabled=linked):
+        store = get_video_store()
+        if result is None:
+            # Écriture par blocs, une seule fois par fichier (les reruns ne le réenregistrent pas)
+            uploaded.seek(0)
+            result = store.add(uploaded, uploaded.name, int(game_id))
+        else:
+            # Correction du match : le même import est rattaché ailleurs, sans nouvelle copie
+            store.link(result.upload_id, int(game_id))
+            result = replace(result, game_id=int(game_id))
+        # Vidéo précédente du match remplacée : son blob est supprimé s'il n'est plus référencé
+        store.gc()
+        saved[uploaded.file_id] = result
+        st.session_state["current_game_id"] = int(game_id)
+        st.rerun()
+
+    if result is not None:
+        game_title = games.loc[games["game_id"] == result.game_id, "title"].iloc[0]
+
+        # Confirmation modal style
+        st.markdown(f"""
+        <div class="nm-card" style="text-align:center;border:2px solid #34C759;padding:24px;">
+          <div style="font-size:32px;margin-bottom:8px;">✅</div>
+          <div style="font-size:17px;font-weight:600;color:#1C1C1E;">Video Imported!</div>
+          <div style="font-size:14px;color:#8E8E93;margin-top:4px;">
+            Linked to {game_title}. Go to the Library tab to view and analyze it.
+          </div>
+          <div style="font-size:12px;color:#8E8E93;margin-top:8px;">
+            {result.size / 1e6:.1f} MB{"" if result.deduplicated or result.seconds <= 0 else f" · {result.throughput / 1e6:.1f} MB/s"}{" · already stored, not duplicated" if result.deduplicated else ""}
+          </div>
+        </div>
+        """, unsafe_allow_html=True)
 
     st.video(uploaded)
 
-    col1, col2 = st.columns(2)
-    with col1:
-        if st.button("📚 Go to Library", use_container_width=True, type="primary"):
-            st.session_state["nav_target"] = "📚  Library"
-            st.rerun()
-    with col2:
-        if st.button("🔍 Analyze Now", use_container_width=True):
-            with st.status("Analyzing your game...", expanded=True) as status:
-                st.write("🎯 Detecting players and court...")
-                time.sleep(1)
-                st.write("🏓 Tracking ball and movements...")
-                time.sleep(1)
-                st.write("📊 Calculating performance metrics...")
-                time.sleep(1)
-                status.update(label="Analysis complete!", state="complete", expanded=False)
-            st.success("✅ Your game is ready in the Library!")
+    if result is not None:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if st.button("📚 Go to Library", use_container_width=True, type="primary"):
+                st.session_state["nav_target"] = "📚  Library"
+                st.rerun()
+        with col2:
+            if st.button("🔍 Analyze Now", use_container_width=True):
+                sport = games.loc[games["game_id"] == result.game_id, "sport"].iloc[0]
+                submit_analysis(result.game_id, sport)
+                st.toast("Analysis queued — you can keep using the app.")
+        with col3:
+            if st.button("✂️ Unlink Video", use_container_width=True):
+                store = get_video_store()
+                store.remove(result.upload_id)
+                store.gc()
+                del saved[uploaded.file_id]
+                st.rerun()
+
+        # Avancement des jobs d'analyse du match, rafraîchi sans bloquer la page
+        @st.fragment(run_every=max(JOB_POLL_SECONDS, 1.0) * 2)
+        def analysis_status(game_id):
+            jobs = JobQueue().jobs_for_game(game_id)
+            job_progress(jobs)
+            if jobs and all(job.finished for job in jobs):
+                st.success("✅ Analysis finished — open the game from the Library.")
+
+        analysis_status(result.game_id)
 
 # ── Pro tips ────────────────────────────────────────────────────────
 section_title("Pro Tips")
@@ -9,15 +9,12 @@ ROOT = Path(__file__).resolve().parent
 sys.path.append(str(ROOT))
 from src.design import (set_ios_design, page_header, section_title,
                          skill_bar, performance_ring, kpi_grid, strengths_focus)
-from src.config import DATA_DIR
+from src.data_access import get_games
+from src.uploads import get_video_store
 
 set_ios_design()
 
-@st.cache_data
-def load_games():
-    return pd.read_csv(DATA_DIR / "demo_games.csv")
-
-games = load_games()
+games = get_games()
 
 # Game selector
 game_options = games["title"].tolist()
@@ -34,10 +31,10 @@ st.session_state["current_game_id"] = game_id
 
 page_header(selected_title, f"🏓 {game['sport']} · {game['date']} · {game['duration']}")
 
-# Linked video preview
-video_path = st.session_state.get("last_uploaded_video")
-if video_path and Path(video_path).exists():
-    st.video(video_path)
+# Linked video preview (résolue via l'index des vidéos importées pour ce match)
+video_path = get_video_store().video_for_game(game_id)
+if video_path and video_path.exists():
+    st.video(str(video_path))
 else:
     st.markdown(
         '<div class="nm-card" style="text-align:center;padding:16px;color:#8E8E93;font-size:13px;">'
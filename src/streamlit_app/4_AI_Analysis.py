@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-import json, os, time
+import os
 from pathlib import Path
 import sys
 from dotenv import load_dotenv
@@ -9,7 +9,11 @@ ROOT = Path(__file__).resolve().parent
 sys.path.append(str(ROOT))
 from src.design import set_ios_design, page_header, section_title
 from src.viz import create_tactical_pitch
-from src.config import PROMPT_PATH_FOOTBALL, PROMPT_PATH_PADEL, PROMPT_PATH_PICKELBALL
+from src.agents.agentmanager.agent import coach_class
+from src.agents.agentmanager.payload import key_events
+from src.agents.agentmanager.prompt_registry import get_prompt_registry
+from src.config import GROQ_EVENTS_PER_REQUEST
+from src.data_access import get_games, get_match_events
 
 set_ios_design()
 load_dotenv()
@@ -17,6 +21,40 @@ api_key = os.getenv("GROQ_API_KEY")
 
 page_header("AI Analysis", "Get instant coaching insights")
 
+# ── Recommendation card ──────────────────────────────────────────────
+def recommendation_card(rec):
+    """Carte d'une recommandation du coach (constat, analyse, action, pro-tip)."""
+    c = rec["contenu"]
+    st.markdown(f"""
+    <div class="nm-card">
+      <div style="font-size:13px;color:#8E8E93;margin-bottom:8px;">⏱ {rec['timestamp']} · {rec['titre']}</div>
+      <div style="margin-bottom:10px;">
+        <div style="font-size:12px;color:#8E8E93;font-weight:600;text-transform:uppercase;letter-spacing:0.04em;margin-bottom:3px;">📝 Constat</div>
+        <div style="font-size:14px;color:#1C1C1E;">{c['constat']}</div>
+      </div>
+      <div style="margin-bottom:10px;">
+        <div style="font-size:12px;color:#8E8E93;font-weight:600;text-transform:uppercase;letter-spacing:0.04em;margin-bottom:3px;">🧠 Analyse</div>
+        <div style="font-size:14px;color:#1C1C1E;">{c['analyse']}</div>
+      </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown(f"""
+    <div class="nm-card-green">
+      <div style="font-size:12px;color:#34C759;font-weight:600;text-transform:uppercase;margin-bottom:3px;">💡 Action</div>
+      <div style="font-size:14px;color:#1A7F3C;">{c['action_corrective']}</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    if c.get("pro_tip"):
+        st.markdown(f"""
+        <div style="background:#EBF5FF;border-radius:12px;padding:14px 16px;margin-bottom:12px;">
+          <div style="font-size:12px;color:#007AFF;font-weight:600;margin-bottom:3px;">🌟 Pro-Tip</div>
+          <div style="font-size:13px;color:#005CC5;font-style:italic;">{c['pro_tip']}</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+
 # ── Sport selector ──────────────────────────────────────────────────
 section_title("Select Sport")
 _sport_options = ["🏓 Pickleball", "⚽ Football", "🎾 Padel"]
@@ -65,79 +103,39 @@ if st.button("🚀 Generate AI Coaching Report", use_container_width=True, type=
     else:
         demo_mode = False
 
-    with st.status("Processing...", expanded=True) as status:
-        st.write("🎯 Detecting key elements...")
-        time.sleep(0.8)
-        st.write("📐 Calculating KPIs and distances...")
-        time.sleep(0.8)
-        status.update(label="Generating AI report...", state="complete", expanded=False)
-
     if demo_mode:
         # Demo output matching iOS app style
-        recommandations = {
-            "recommandations_coach": [
-                {
-                    "timestamp": f"{minute}:00",
-                    "titre": "Positioning Error",
-                    "contenu": {
-                        "constat": f"Error detected at minute {minute} — {event_type} in zone x={x}.",
-                        "analyse": "Body orientation was closed, preventing vision of teammate's run. The position relative to the net was too passive.",
-                        "action_corrective": "Scan the court every 2 seconds before receiving. Work on open body positioning drills with a partner.",
-                        "pro_tip": "Observe how Ben Johns positions his feet before each kitchen exchange — always sideways, never flat-footed."
-                    }
+        recommandations = iter([
+            {
+                "timestamp": f"{minute}:00",
+                "titre": "Positioning Error",
+                "contenu": {
+                    "constat": f"Error detected at minute {minute} — {event_type} in zone x={x}.",
+                    "analyse": "Body orientation was closed, preventing vision of teammate's run. The position relative to the net was too passive.",
+                    "action_corrective": "Scan the court every 2 seconds before receiving. Work on open body positioning drills with a partner.",
+                    "pro_tip": "Observe how Ben Johns positions his feet before each kitchen exchange — always sideways, never flat-footed."
                 }
-            ]
-        }
+            }
+        ])
     else:
         try:
-            if "Football" in sport:
-                from src.agents.agentfootball.agent_recommendation_football import FootballCoachAI
-
-                with open(PROMPT_PATH_FOOTBALL / "example_entry.json", "r", encoding="utf-8") as f:
-                    match_data = json.load(f)
-                match_data["joueur_analyse"]["nom"] = player
-                match_data["donnees_sequences"][0]["timestamp_debut"] = f"{minute}:00"
-                match_data["donnees_sequences"][0]["evenement_cle"] = event_type
-                match_data["donnees_sequences"][0]["metriques_video"]["coordonnees_ballon"] = {"x": x, "y": y}
-
-                with open(PROMPT_PATH_FOOTBALL / "context_football.txt", encoding="utf-8") as f: context = f.read()
-                with open(PROMPT_PATH_FOOTBALL / "user_prompt_football.txt", encoding="utf-8") as f: prompt = f.read()
-                user_prompt = f"{prompt}\nVoici les données du match : {match_data}"
-
-                coach = FootballCoachAI(context, user_prompt)
-            elif "Padel" in sport:
-                from src.agents.agentpadel.agent_recommendation_padel import PadelCoachAI
-
-                with open(PROMPT_PATH_PADEL / "example_entry.json", "r", encoding="utf-8") as f:
-                    match_data = json.load(f)
-                match_data["joueur_analyse"]["nom"] = player
-                match_data["donnees_sequences"][0]["timestamp"] = f"{minute}:00"
-                match_data["donnees_sequences"][0]["evenement_cle"] = event_type
-                match_data["donnees_sequences"][0]["metriques_video"]["position_pieds"] = {"x": x, "y": y}
-
-                with open(PROMPT_PATH_PADEL / "context_padel.txt", encoding="utf-8") as f: context = f.read()
-                with open(PROMPT_PATH_PADEL / "user_prompt_padel.txt", encoding="utf-8") as f: prompt = f.read()
-                user_prompt = f"{prompt}\nVoici les données du match : {match_data}"
-
-                coach = PadelCoachAI(context, user_prompt)
+            sport_value = st.session_state["sport"]
+            # Prompts et exemple de match servis par le registre (chargés une fois par processus)
+            match_data = get_prompt_registry().get(sport_value).match_data()
+            sequence = match_data["donnees_sequences"][0]
+            match_data["joueur_analyse"]["nom"] = player
+            sequence["evenement_cle"] = event_type
+            if sport_value == "football":
+                sequence["timestamp_debut"] = f"{minute}:00"
+                sequence["metriques_video"]["coordonnees_ballon"] = {"x": x, "y": y}
             else:
-                from src.agents.agentpickelball.agent_recommendation_pickelball import PickelballCoachAI
-
-                with open(PROMPT_PATH_PICKELBALL / "example_entry.json", "r", encoding="utf-8") as f:
-                    match_data = json.load(f)
-                match_data["joueur_analyse"]["nom"] = player
-                match_data["donnees_sequences"][0]["timestamp"] = f"{minute}:00"
-                match_data["donnees_sequences"][0]["evenement_cle"] = event_type
-                match_data["donnees_sequences"][0]["metriques_video"]["position_pieds"] = {"x": x, "y": y}
-
-                with open(PROMPT_PATH_PICKELBALL / "context_pickelball.txt", encoding="utf-8") as f: context = f.read()
-                with open(PROMPT_PATH_PICKELBALL / "user_prompt_pickelball.txt", encoding="utf-8") as f: prompt = f.read()
-                user_prompt = f"{prompt}\nVoici les données du match : {match_data}"
+                sequence["timestamp"] = f"{minute}:00"
+                sequence["metriques_video"]["position_pieds"] = {"x": x, "y": y}
 
-                coach = PickelballCoachAI(context, user_prompt)
+            coach = coach_class(sport_value).for_match(match_data, event=event_type, minute=minute)
 
-            with st.spinner("SmartCoach is writing recommendations..."):
-                recommandations = coach.generate_recommendations(match_data)
+            # Générateur : chaque recommandation est affichée dès que le modèle l'a écrite
+            recommandations = coach.stream_recommendations(match_data)
         except Exception as e:
             st.error(f"AI Error: {e}")
             st.stop()
@@ -145,39 +143,6 @@ if st.button("🚀 Generate AI Coaching Report", use_container_width=True, type=
     # ── Results display ───────────────────────────────────────────────
     col_rec, col_pitch = st.columns([1, 1])
 
-    with col_rec:
-        section_title("🧠 Coach Recommendations")
-        for rec in recommandations.get("recommandations_coach", []):
-            c = rec["contenu"]
-            st.markdown(f"""
-            <div class="nm-card">
-              <div style="font-size:13px;color:#8E8E93;margin-bottom:8px;">⏱ {rec['timestamp']} · {rec['titre']}</div>
-              <div style="margin-bottom:10px;">
-                <div style="font-size:12px;color:#8E8E93;font-weight:600;text-transform:uppercase;letter-spacing:0.04em;margin-bottom:3px;">📝 Constat</div>
-                <div style="font-size:14px;color:#1C1C1E;">{c['constat']}</div>
-              </div>
-              <div style="margin-bottom:10px;">
-                <div style="font-size:12px;color:#8E8E93;font-weight:600;text-transform:uppercase;letter-spacing:0.04em;margin-bottom:3px;">🧠 Analyse</div>
-                <div style="font-size:14px;color:#1C1C1E;">{c['analyse']}</div>
-              </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-            st.markdown(f"""
-            <div class="nm-card-green">
-              <div style="font-size:12px;color:#34C759;font-weight:600;text-transform:uppercase;margin-bottom:3px;">💡 Action</div>
-              <div style="font-size:14px;color:#1A7F3C;">{c['action_corrective']}</div>
-            </div>
-            """, unsafe_allow_html=True)
-
-            if c.get("pro_tip"):
-                st.markdown(f"""
-                <div style="background:#EBF5FF;border-radius:12px;padding:14px 16px;margin-bottom:12px;">
-                  <div style="font-size:12px;color:#007AFF;font-weight:600;margin-bottom:3px;">🌟 Pro-Tip</div>
-                  <div style="font-size:13px;color:#005CC5;font-style:italic;">{c['pro_tip']}</div>
-                </div>
-                """, unsafe_allow_html=True)
-
     with col_pitch:
         section_title("📍 Tactical View")
         pitch_fig = create_tactical_pitch(
@@ -190,3 +155,63 @@ if st.button("🚀 Generate AI Coaching Report", use_container_width=True, type=
             font=dict(family="DM Sans")
         )
         st.plotly_chart(pitch_fig, use_container_width=True)
+
+    with col_rec:
+        section_title("🧠 Coach Recommendations")
+        try:
+            with st.spinner("SmartCoach is writing recommendations..."):
+                for rec in recommandations:
+                    recommendation_card(rec)
+        except Exception as e:
+            st.error(f"AI Error: {e}")
+
+st.markdown("<hr>", unsafe_allow_html=True)
+
+# ── Whole-match annotation ───────────────────────────────────────────
+section_title("Annotate a Whole Match")
+sport_value = st.session_state["sport"]
+games = get_games()
+sport_games = games[games["sport"].str.lower() == sport_value]
+
+if sport_games.empty:
+    st.info("No recorded match for this sport yet.")
+else:
+    col_game, col_types = st.columns(2)
+    with col_game:
+        game_ids = sport_games["game_id"].tolist()
+        game_id = st.selectbox("Match", game_ids,
+                               format_func=lambda gid: sport_games.loc[sport_games["game_id"] == gid, "title"].iloc[0],
+                               key="annotate_game_select")
+        # Joueur analysé dans ce match (indépendant du champ Player de l'action ci-dessus)
+        annotate_player = st.text_input("Player", value=get_prompt_registry().get(sport_value).example["joueur_analyse"]["nom"],
+                                        key=f"annotate_player_{game_id}")
+    match_events = get_match_events(game_id)
+    with col_types:
+        available_types = sorted(match_events["type"].dropna().astype(str).unique())
+        event_types = st.multiselect("Event types", available_types,
+                                     default=["ERROR"] if "ERROR" in available_types else available_types[:1],
+                                     key="annotate_event_types")
+
+    events = key_events(match_events, event_types)
+    st.caption(f"{len(events)} key events · up to {GROQ_EVENTS_PER_REQUEST} per AI request")
+
+    if st.button("📝 Annotate Key Events", use_container_width=True, disabled=not events):
+        if not api_key:
+            st.warning("⚠️ No GROQ_API_KEY found. Whole-match annotation needs the AI coach.")
+        else:
+            try:
+                # Plusieurs événements par requête : le contexte du coach n'est envoyé qu'une fois par lot
+                with st.spinner(f"SmartCoach is annotating {len(events)} events..."):
+                    coach = coach_class(sport_value).for_sport()
+                    results = coach.annotate_events(events, {"nom": annotate_player})
+            except Exception as e:
+                st.error(f"AI Error: {e}")
+                st.stop()
+
+            for event in events:
+                result = results[event["id"]]
+                label = f"{event['minute']}:00 · {event['type']}" + (f" · {event['phase']}" if event.get("phase") else "")
+                if result.ok:
+                    recommendation_card({"timestamp": f"{event['minute']}:00", "titre": event["type"], **result.result})
+                else:
+                    st.warning(f"⏱ {label} — {result.error}")
@@ -8,27 +8,20 @@ ROOT = Path(__file__).resolve().parent
 sys.path.append(str(ROOT))
 from src.design import set_ios_design, page_header, section_title
 from src.patterns_engine import compute_match_patterns
-from src.config import DATA_DIR
+from src.spatial_engine import compute_heatmap_grid
+from src.sequence_engine import mine_sequences, sequence_insights
+from src.viz import create_heatmap
+from src.data_access import data_version, get_events, get_games, get_match_events
 
 set_ios_design()
 page_header("Patterns", "Tactical trends & collective behaviour")
 
-@st.cache_data
-def load_games():   return pd.read_csv(DATA_DIR / "demo_games.csv")
+# Données partagées par toutes les sessions ; les caches dérivés sont indexés sur leur version
+version = data_version()
+events = get_events()
+has_events = len(events) > 0
 
-try:
-    @st.cache_data
-    def load_events(): 
-        df = pd.read_csv(DATA_DIR / "demo_events.csv")
-        df["type"]  = df["type"].astype(str)
-        df["phase"] = df["phase"].astype(str)
-        return df
-    events = load_events()
-    has_events = True
-except FileNotFoundError:
-    has_events = False
-
-games = load_games()
+games = get_games()
 game_options = games["title"].tolist()
 current_id = st.session_state.get("current_game_id")
 if current_id in games["game_id"].values:
@@ -58,9 +51,13 @@ if not has_events:
         ]
     }
 else:
-    game_row = games[games["title"] == selected].iloc[0]
-    match_events = events[events["match_id"] == int(game_row["game_id"])].copy()
-    patterns = compute_match_patterns(match_events)
+    # Events du match lus via l'index par match (plage de lignes du store, sans parcours de la table)
+    @st.cache_data
+    def load_patterns(game_id, version):
+        return compute_match_patterns(get_match_events(game_id))
+
+    game_id = st.session_state["current_game_id"]
+    patterns = load_patterns(game_id, version)
 
 # ── KPIs ─────────────────────────────────────────────────────────────
 section_title("Volume")
@@ -103,6 +100,27 @@ with col2:
 
 st.markdown("<hr>", unsafe_allow_html=True)
 
+# ── Spatial heatmap ───────────────────────────────────────────────────
+if has_events:
+    # Grille de densité du match (rendu indépendant du volume d'events)
+    @st.cache_data
+    def load_heatmap(game_id, version):
+        return compute_heatmap_grid(get_match_events(game_id))
+
+    section_title("Heatmap")
+    heat_type = st.radio("Event type", ["All", "WINNER", "ERROR", "SHOT"], horizontal=True,
+                         label_visibility="collapsed", key="patterns_heatmap_type")
+    grid = load_heatmap(game_id, version)
+    fig3 = create_heatmap(grid, None if heat_type == "All" else heat_type)
+    fig3.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font=dict(family="DM Sans")
+    )
+    st.plotly_chart(fig3, use_container_width=True)
+
+    st.markdown("<hr>", unsafe_allow_html=True)
+
 # ── Structural alerts ─────────────────────────────────────────────────
 section_title("⚠️ Structural Alerts")
 
@@ -114,8 +132,22 @@ elif level == "Moyenne":
 else:
     st.success(f"**Priority level: {level}**")
 
+insights = list(patterns["insights"])
+if has_events:
+    # Séquences récurrentes (n-grammes d'events) : du match sélectionné et de la saison
+    @st.cache_data
+    def load_match_sequences(game_id, version):
+        return mine_sequences(get_match_events(game_id))
+
+    @st.cache_data
+    def load_season_sequences(version):
+        return mine_sequences(get_events())
+
+    season_sequences = load_season_sequences(version)
+    insights += sequence_insights(load_match_sequences(game_id, version))
+
 st.markdown('<div class="nm-card">', unsafe_allow_html=True)
-for insight in patterns["insights"]:
+for insight in insights:
     st.markdown(f"""
     <div class="insight-item">
       <div class="insight-dot" style="background:#FF9500;"></div>
@@ -123,3 +155,17 @@ for insight in patterns["insights"]:
     </div>
     """, unsafe_allow_html=True)
 st.markdown('</div>', unsafe_allow_html=True)
+
+# ── Recurring sequences (all matches) ─────────────────────────────────
+if has_events and season_sequences:
+    section_title("🔁 Recurring Sequences")
+    st.markdown('<p class="page-subtitle">Most significant event chains across all matches</p>', unsafe_allow_html=True)
+    st.dataframe(
+        pd.DataFrame([
+            {"Sequence": p.label, "Count": p.count, "Matches": p.matches,
+             "Support": round(p.support, 3), "Lift": round(p.lift, 2)}
+            for p in season_sequences[:10]
+        ]),
+        hide_index=True,
+        use_container_width=True
+    )
@@ -1,5 +1,5 @@
 import streamlit as st
-import json, os, time
+import os
 from pathlib import Path
 import sys
 from dotenv import load_dotenv
@@ -7,7 +7,8 @@ from dotenv import load_dotenv
 ROOT = Path(__file__).resolve().parent
 sys.path.append(str(ROOT))
 from src.design import set_ios_design, page_header, section_title
-from src.config import PROMPT_PATHS
+from src.agents.agentmanager.agent import coach_class
+from src.agents.agentmanager.prompt_registry import get_prompt_registry
 
 set_ios_design()
 load_dotenv()
@@ -19,22 +20,19 @@ page_header("Training Plan", "Your personalized weekly program")
 section_title("Select Sport")
 _sport_options = ["🏓 Pickleball", "⚽ Football", "🎾 Padel"]
 _sport_values = ["pickleball", "football", "padel"]
-_file_suffixes = {"pickleball": "pickelball", "football": "football", "padel": "padel"}
 default_sport_index = _sport_values.index(st.session_state.get("sport", "pickleball")) if st.session_state.get("sport", "pickleball") in _sport_values else 0
 sport = st.radio("Sport", _sport_options, index=default_sport_index, horizontal=True, label_visibility="collapsed", key="sport_radio_training")
 st.session_state["sport"] = _sport_values[_sport_options.index(sport)]
 sport_value = st.session_state["sport"]
-file_suffix = _file_suffixes[sport_value]
 sport_badge = sport
 
 st.markdown("<hr>", unsafe_allow_html=True)
 
 # ── Player info ──────────────────────────────────────────────────────
 try:
-    with open(PROMPT_PATHS[sport_value] / "example_entry.json", encoding="utf-8") as f:
-        match_data = json.load(f)
+    match_data = get_prompt_registry().get(sport_value).match_data()
     joueur = match_data["joueur_analyse"]
-except FileNotFoundError:
+except (OSError, ValueError):
     match_data = {"joueur_analyse": {"nom": "Player", "position_predilection": "All-round"}, "donnees_sequences": []}
     joueur = match_data["joueur_analyse"]
 
@@ -72,104 +70,89 @@ if st.button("🧠 Generate Weekly Training Plan", type="primary", use_container
 
     demo_mode = not api_key
 
-    with st.spinner("SmartCoach is building your program..."):
-        time.sleep(1.5)
-
-        if demo_mode:
-            _demo_content = {
-                "pickleball": [
-                    {
-                        "timestamp": "24:00",
-                        "titre": "Third Shot Drop",
-                        "contenu": {
-                            "constat": "Third shot was consistently too hard, giving opponents easy volleys.",
-                            "analyse": "Grip pressure too high at contact. Body weight not shifting forward properly.",
-                            "action_corrective": "Practice 20 third shot drops daily from the baseline. Focus on soft hands and low trajectory over the net.",
-                            "pro_tip": "Watch Anna Leigh Waters — notice how she relaxes her grip before contact on every third shot."
-                        }
-                    },
-                    {
-                        "timestamp": "38:00",
-                        "titre": "Dinking Consistency",
-                        "contenu": {
-                            "constat": "Dink exchanges broken too early with aggressive shots.",
-                            "analyse": "Patience threshold too low in kitchen rallies. Attacking from below net height.",
-                            "action_corrective": "Kitchen dinking drill: maintain 15+ shot rallies with partner before attempting any attack. Attack only above net height.",
-                            "pro_tip": "Ben Johns never rushes the dink — he waits for the ball to rise above net tape before any attack."
-                        }
+    if demo_mode:
+        _demo_content = {
+            "pickleball": [
+                {
+                    "timestamp": "24:00",
+                    "titre": "Third Shot Drop",
+                    "contenu": {
+                        "constat": "Third shot was consistently too hard, giving opponents easy volleys.",
+                        "analyse": "Grip pressure too high at contact. Body weight not shifting forward properly.",
+                        "action_corrective": "Practice 20 third shot drops daily from the baseline. Focus on soft hands and low trajectory over the net.",
+                        "pro_tip": "Watch Anna Leigh Waters — notice how she relaxes her grip before contact on every third shot."
                     }
-                ],
-                "football": [
-                    {
-                        "timestamp": "24:10",
-                        "titre": "Decision Making in Transition",
-                        "contenu": {
-                            "constat": "Ball lost under pressure during a fast offensive transition.",
-                            "analyse": "Body orientation closed before receiving, limiting the field of vision and passing options.",
-                            "action_corrective": "Practice scanning drills: check over both shoulders every 2 seconds before receiving the ball.",
-                            "pro_tip": "Watch Kevin De Bruyne — he always scans the pitch before the ball even arrives at his feet."
-                        }
-                    },
-                    {
-                        "timestamp": "38:35",
-                        "titre": "Finishing Composure",
-                        "contenu": {
-                            "constat": "Shot on target rate too low in the final third.",
-                            "analyse": "Rushed shot selection under pressure, poor plant-foot placement.",
-                            "action_corrective": "Finishing drills: 30 shots per session focusing on plant-foot alignment and picking a corner before striking.",
-                            "pro_tip": "Erling Haaland always picks his target before the ball arrives — decide early, execute calmly."
-                        }
+                },
+                {
+                    "timestamp": "38:00",
+                    "titre": "Dinking Consistency",
+                    "contenu": {
+                        "constat": "Dink exchanges broken too early with aggressive shots.",
+                        "analyse": "Patience threshold too low in kitchen rallies. Attacking from below net height.",
+                        "action_corrective": "Kitchen dinking drill: maintain 15+ shot rallies with partner before attempting any attack. Attack only above net height.",
+                        "pro_tip": "Ben Johns never rushes the dink — he waits for the ball to rise above net tape before any attack."
                     }
-                ],
-                "padel": [
-                    {
-                        "timestamp": "14:20",
-                        "titre": "Net Positioning Discipline",
-                        "contenu": {
-                            "constat": "Direct fault at the net after moving in too early.",
-                            "analyse": "Court positioning too aggressive against a lobbing opponent pair.",
-                            "action_corrective": "Net approach drill: only move up after your partner's shot has crossed the net with a safe trajectory.",
-                            "pro_tip": "Juan Lebrón always confirms his partner's shot quality before committing to the net."
-                        }
-                    },
-                    {
-                        "timestamp": "27:05",
-                        "titre": "Off-the-Glass Anticipation",
-                        "contenu": {
-                            "constat": "Missed glass exit due to poor bounce anticipation.",
-                            "analyse": "Late reaction to ball height and speed after the glass rebound.",
-                            "action_corrective": "Glass exit drill: repeat controlled feeds off the back glass, focusing on early split-step and racket preparation.",
-                            "pro_tip": "Alejandra Salazar tracks the ball off the glass with small adjustment steps, never standing flat-footed."
-                        }
+                }
+            ],
+            "football": [
+                {
+                    "timestamp": "24:10",
+                    "titre": "Decision Making in Transition",
+                    "contenu": {
+                        "constat": "Ball lost under pressure during a fast offensive transition.",
+                        "analyse": "Body orientation closed before receiving, limiting the field of vision and passing options.",
+                        "action_corrective": "Practice scanning drills: check over both shoulders every 2 seconds before receiving the ball.",
+                        "pro_tip": "Watch Kevin De Bruyne — he always scans the pitch before the ball even arrives at his feet."
                     }
-                ]
-            }
-            recommandations = {"recommandations_coach": _demo_content[sport_value]}
-        else:
-            try:
-                if sport_value == "football":
-                    from src.agents.agentfootball.agent_recommendation_football import FootballCoachAI as CoachClass
-                elif sport_value == "padel":
-                    from src.agents.agentpadel.agent_recommendation_padel import PadelCoachAI as CoachClass
-                else:
-                    from src.agents.agentpickelball.agent_recommendation_pickelball import PickelballCoachAI as CoachClass
-
-                with open(PROMPT_PATHS[sport_value] / f"context_{file_suffix}.txt", encoding="utf-8") as f:  context = f.read()
-                with open(PROMPT_PATHS[sport_value] / f"user_prompt_{file_suffix}.txt", encoding="utf-8") as f: prompt = f.read()
-                user_prompt = f"{prompt}\nVoici l'intégralité des données du match : {match_data}"
-                coach = CoachClass(context, user_prompt)
-                recommandations = coach.generate_recommendations(match_data)
-            except Exception as e:
-                st.error(f"AI Error: {e}")
-                st.stop()
-
-    st.success("✅ Program generated!")
+                },
+                {
+                    "timestamp": "38:35",
+                    "titre": "Finishing Composure",
+                    "contenu": {
+                        "constat": "Shot on target rate too low in the final third.",
+                        "analyse": "Rushed shot selection under pressure, poor plant-foot placement.",
+                        "action_corrective": "Finishing drills: 30 shots per session focusing on plant-foot alignment and picking a corner before striking.",
+                        "pro_tip": "Erling Haaland always picks his target before the ball arrives — decide early, execute calmly."
+                    }
+                }
+            ],
+            "padel": [
+                {
+                    "timestamp": "14:20",
+                    "titre": "Net Positioning Discipline",
+                    "contenu": {
+                        "constat": "Direct fault at the net after moving in too early.",
+                        "analyse": "Court positioning too aggressive against a lobbing opponent pair.",
+                        "action_corrective": "Net approach drill: only move up after your partner's shot has crossed the net with a safe trajectory.",
+                        "pro_tip": "Juan Lebrón always confirms his partner's shot quality before committing to the net."
+                    }
+                },
+                {
+                    "timestamp": "27:05",
+                    "titre": "Off-the-Glass Anticipation",
+                    "contenu": {
+                        "constat": "Missed glass exit due to poor bounce anticipation.",
+                        "analyse": "Late reaction to ball height and speed after the glass rebound.",
+                        "action_corrective": "Glass exit drill: repeat controlled feeds off the back glass, focusing on early split-step and racket preparation.",
+                        "pro_tip": "Alejandra Salazar tracks the ball off the glass with small adjustment steps, never standing flat-footed."
+                    }
+                }
+            ]
+        }
+        recommandations = iter(_demo_content[sport_value])
+    else:
+        try:
+            coach = coach_class(sport_value).for_match(match_data, "Voici l'intégralité des données du match")
+            # Générateur : chaque atelier est affiché dès que le modèle l'a écrit
+            recommandations = coach.stream_recommendations(match_data)
+        except Exception as e:
+            st.error(f"AI Error: {e}")
+            st.stop()
 
     # ── Training cards ─────────────────────────────────────────────────
     section_title("🎯 Priority Workshops")
-    recs = recommandations.get("recommandations_coach", [])
 
-    for i, rec in enumerate(recs):
+    def workshop_card(i, rec):
         c = rec["contenu"]
         st.markdown(f"""
         <div class="nm-card">
@@ -200,6 +183,16 @@ if st.button("🧠 Generate Weekly Training Plan", type="primary", use_container
             </div>
             """, unsafe_allow_html=True)
 
+    try:
+        with st.spinner("SmartCoach is building your program..."):
+            for i, rec in enumerate(recommandations):
+                workshop_card(i, rec)
+    except Exception as e:
+        st.error(f"AI Error: {e}")
+        st.stop()
+
+    st.success("✅ Program generated!")
+
     st.markdown("<hr>", unsafe_allow_html=True)
 
     col1, col2, col3 = st.columns([1, 2, 1])
@@ -0,0 +1,74 @@
+from typing import Any, Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+
+
+class EventWindowIndex:
+    """
+    Index temporel pré-calculé des events d'un ou plusieurs matchs.
+
+    Pour chaque type d'event, les minutes sont stockées triées (clé composite
+    match/minute), ce qui permet de répondre à "combien d'events de type T dans
+    [t - w, t]" en O(log n) par requête, au lieu de refiltrer tout le DataFrame.
+
+    match_events : events à indexer (colonnes type, minute, et match_id si by est utilisé)
+    types : types d'events à indexer (par défaut : tous ceux présents)
+    by : colonne de regroupement (ex. "match_id") ; None = un seul match
+    """
+
+    def __init__(self, match_events: pd.DataFrame, types: Optional[Iterable[str]] = None, by: Optional[str] = None):
+        event_type = match_events["type"].astype(str).str.upper().to_numpy()
+        minute = match_events["minute"].to_numpy(dtype=float)
+
+        self.by = by
+        if by is not None:
+            codes, uniques = pd.factorize(match_events[by])
+            self._groups = pd.Index(uniques)
+        else:
+            codes = np.zeros(len(match_events), dtype=int)
+            self._groups = None
+
+        # Clé composite : les minutes d'un match forment un bloc contigu de largeur span
+        # Minutes manquantes (NaN) : clés NaN, triées en fin de tableau et jamais comptées
+        known = minute[~np.isnan(minute)]
+        self._lowest = float(known.min()) if len(known) else 0.0
+        self._highest = float(known.max()) if len(known) else 0.0
+        self._span = self._highest - self._lowest + 1
+        keys = codes * self._span + (minute - self._lowest)
+
+        if types is None:
+            types = pd.unique(event_type)
+        self._keys: Dict[str, np.ndarray] = {
+            str(t).upper(): np.sort(keys[event_type == str(t).upper()])
+            for t in types
+        }
+
+    def _group_codes(self, match_ids: Any, size: int) -> np.ndarray:
+        if self._groups is None:
+            return np.zeros(size, dtype=int)
+        return self._groups.get_indexer(np.broadcast_to(np.asarray(match_ids, dtype=object), (size,)))
+
+    def count_many(self, event_type: str, minutes: Any, window: float = 5, match_ids: Any = None) -> np.ndarray:
+        """Nombre d'events de type event_type dans [minute - window, minute], pour chaque minute."""
+        keys = self._keys.get(str(event_type).upper())
+        if keys is None:
+            raise KeyError(f"Type d'event non indexé : {event_type}")
+
+        minutes = np.atleast_1d(np.asarray(minutes, dtype=float))
+        codes = self._group_codes(match_ids, len(minutes))
+
+        # Bornes ramenées dans le bloc du match pour ne jamais déborder sur le voisin
+        start = np.clip(minutes - window - self._lowest, 0, self._span - 1)
+        stop = np.clip(minutes - self._lowest, -1, self._span - 1)
+        counts = (
+            np.searchsorted(keys, codes * self._span + stop, side="right")
+            - np.searchsorted(keys, codes * self._span + start, side="left")
+        )
+
+        # Match inconnu de l'index, minute manquante ou fenêtre entièrement hors des minutes indexées
+        empty = (codes < 0) | np.isnan(minutes) | (minutes < self._lowest) | (minutes - window > self._highest)
+        return np.where(empty, 0, np.maximum(counts, 0))
+
+    def count(self, event_type: str, minute: float, window: float = 5, match_id: Any = None) -> int:
+        """Version scalaire de count_many."""
+        return int(self.count_many(event_type, [minute], window, match_id)[0])
@@ -0,0 +1,233 @@
+import hashlib
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+import pandas as pd
+
+from src.encoding import ZONE_LABELS
+from src.patterns_engine import compute_match_patterns
+
+
+@dataclass
+class MatchAggregate:
+    """Agrégats d'un match pour un joueur (une valeur absente n'alimente pas sa tendance)."""
+    match_id: Any
+    date: Optional[str] = None
+    rating: Optional[float] = None
+    winners: Optional[int] = None
+    errors: Optional[int] = None
+    transition_ratio: Optional[float] = None
+    zone_shares: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_summary(cls, match_id: Any, summary: Dict[str, Any],
+                     rating: Optional[float] = None, date: Optional[str] = None) -> "MatchAggregate":
+        """À partir d'un résumé de patterns_engine (compute_match_patterns)."""
+        total = summary["total_events"]
+        return cls(
+            match_id=match_id,
+            date=date,
+            rating=rating,
+            winners=summary["total_winners"],
+            errors=summary["total_errors"],
+            transition_ratio=summary["transition_risk_ratio"],
+            zone_shares={
+                zone: summary["zone_distribution"].get(zone, 0) / total for zone in ZONE_LABELS
+            } if total else {},
+        )
+
+    def metrics(self) -> Dict[str, float]:
+        values = {
+            "rating": self.rating,
+            "winners": self.winners,
+            "errors": self.errors,
+            "transition_ratio": self.transition_ratio,
+        }
+        values.update({f"zone:{zone}": share for zone, share in self.zone_shares.items()})
+        return {name: float(value) for name, value in values.items() if value is not None}
+
+
+class MetricTrend:
+    """
+    Tendance d'une métrique mise à jour en O(1) à chaque match : moyenne glissante
+    (somme sur une fenêtre), delta de cette moyenne, EWMA et moyenne globale.
+    """
+
+    def __init__(self, window: int = 5, alpha: float = 0.3):
+        self.alpha = alpha
+        self.values: Deque[float] = deque(maxlen=window)
+        self.window_sum = 0.0
+        self.count = 0
+        self.total = 0.0
+        self.ewma: Optional[float] = None
+        self.last: Optional[float] = None
+        self.previous_rolling_mean: Optional[float] = None
+
+    @property
+    def rolling_mean(self) -> Optional[float]:
+        return self.window_sum / len(self.values) if self.values else None
+
+    def add(self, value: float) -> None:
+        self.previous_rolling_mean = self.rolling_mean
+        if len(self.values) == self.values.maxlen:
+            self.window_sum -= self.values[0]
+        self.values.append(value)
+        self.window_sum += value
+
+        self.ewma = value if self.ewma is None else self.alpha * value + (1 - self.alpha) * self.ewma
+        self.count += 1
+        self.total += value
+        self.last = value
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        rolling_mean = self.rolling_mean
+        delta = None
+        if rolling_mean is not None and self.previous_rolling_mean is not None:
+            delta = rolling_mean - self.previous_rolling_mean
+        return {
+            "last": self.last,
+            "mean": self.total / self.count if self.count else None,
+            "rolling_mean": rolling_mean,
+            "delta": delta,
+            "ewma": self.ewma,
+            "count": self.count,
+        }
+
+
+class PlayerTrend:
+    """Historique des agrégats par match d'un joueur et tendances de chaque métrique."""
+
+    def __init__(self, player: str, window: int = 5, alpha: float = 0.3):
+        self.player = player
+        self.window = window
+        self.alpha = alpha
+        self.matches: List[MatchAggregate] = []
+        self.metrics: Dict[str, MetricTrend] = {}
+
+    def add_match(self, aggregate: MatchAggregate) -> None:
+        """Ajoute un match (dans l'ordre chronologique) sans recalcul de l'historique."""
+        self.matches.append(aggregate)
+        for name, value in aggregate.metrics().items():
+            if name not in self.metrics:
+                self.metrics[name] = MetricTrend(self.window, self.alpha)
+            self.metrics[name].add(value)
+
+    def progress(self) -> Dict[str, Any]:
+        """Vue de progression instantanée (aucun parcours de l'historique)."""
+        return {
+            "player": self.player,
+            "games_analyzed": len(self.matches),
+            "last_match": self.matches[-1] if self.matches else None,
+            "metrics": {name: trend.snapshot() for name, trend in self.metrics.items()},
+        }
+
+
+class TrendEngine:
+    """Tendances de tous les joueurs, alimentées match par match."""
+
+    def __init__(self, window: int = 5, alpha: float = 0.3):
+        self.window = window
+        self.alpha = alpha
+        self.players: Dict[str, PlayerTrend] = {}
+
+    def player(self, player: str) -> PlayerTrend:
+        if player not in self.players:
+            self.players[player] = PlayerTrend(player, self.window, self.alpha)
+        return self.players[player]
+
+    def add_match(self, player: str, aggregate: MatchAggregate) -> None:
+        self.player(player).add_match(aggregate)
+
+
+# Colonnes d'events dont dépend l'agrégat d'un match
+FINGERPRINT_COLUMNS = ["type", "phase", "minute", "x", "y"]
+
+
+def _events_fingerprint(match_events: pd.DataFrame) -> str:
+    """Empreinte du contenu des events d'un match (change si un type, une phase ou une position change)."""
+    columns = [column for column in FINGERPRINT_COLUMNS if column in match_events.columns]
+    hashes = pd.util.hash_pandas_object(match_events[columns].astype(object), index=False)
+    return hashlib.blake2b(hashes.to_numpy().tobytes(), digest_size=16).hexdigest()
+
+
+def _ready_games(games: pd.DataFrame) -> pd.DataFrame:
+    """Matchs "ready" dans l'ordre chronologique (ordre d'alimentation des tendances)."""
+    return games[games["status"] == "ready"].sort_values("date", kind="stable")
+
+
+def _game_aggregate(game: pd.Series, summary: Optional[Dict[str, Any]]) -> MatchAggregate:
+    """Agrégat d'un match ; sans résumé de patterns, winners/errors de la table des matchs."""
+    game_id = int(game["game_id"])
+    rating = float(game["rating"])
+    if summary is not None:
+        return MatchAggregate.from_summary(game_id, summary, rating, game["date"])
+    return MatchAggregate(game_id, game["date"], rating, int(game["winners"]), int(game["errors"]))
+
+
+def build_trend_engine(games: pd.DataFrame, patterns: Dict[Any, Dict[str, Any]],
+                       player: str = "me", window: int = 5, alpha: float = 0.3) -> TrendEngine:
+    """
+    Initialise les tendances depuis la table des matchs (ordre chronologique, matchs
+    "ready" uniquement) et les résumés de patterns par match_id. Sans résumé, les
+    winners/errors de la table des matchs sont utilisés.
+    """
+    engine = TrendEngine(window, alpha)
+    for _, game in _ready_games(games).iterrows():
+        engine.add_match(player, _game_aggregate(game, patterns.get(int(game["game_id"]))))
+    return engine
+
+
+class TrendTracker:
+    """
+    Moteur de tendances gardé d'une version des données à l'autre : les nouveaux
+    matchs sont ajoutés avec add_match (patterns calculés sur leurs seuls events) ;
+    l'historique n'est reconstruit que si un match déjà compté a changé ou disparu,
+    ou si un nouveau match est antérieur au dernier compté.
+    """
+
+    def __init__(self, player: str = "me", window: int = 5, alpha: float = 0.3):
+        self.player = player
+        self.engine = TrendEngine(window, alpha)
+        self.rebuilds = 0
+        self._fingerprints: Dict[int, Tuple] = {}
+        self._version: Optional[Hashable] = None
+        self._lock = threading.Lock()
+
+    def update(self, games: pd.DataFrame, match_events: Callable[[int], pd.DataFrame],
+               version: Optional[Hashable] = None) -> TrendEngine:
+        """
+        Met le moteur à jour avec la table des matchs ; match_events(game_id) donne les
+        events d'un match. Sans effet si version est celle de la dernière mise à jour.
+        """
+        with self._lock:
+            if version is not None and version == self._version:
+                return self.engine
+
+            ready = _ready_games(games)
+            events = {int(game_id): match_events(int(game_id)) for game_id in ready["game_id"]}
+            # Empreinte d'un match : ce qui alimente son agrégat
+            fingerprints = {
+                int(game["game_id"]): (game["date"], game["rating"], game["winners"], game["errors"],
+                                       _events_fingerprint(events[int(game["game_id"])]))
+                for _, game in ready.iterrows()
+            }
+
+            new = ready[~ready["game_id"].astype(int).isin(list(self._fingerprints))]
+            matches = self.engine.player(self.player).matches
+            changed = any(fingerprints.get(game_id) != fingerprint
+                          for game_id, fingerprint in self._fingerprints.items())
+            earlier = bool(matches) and len(new) > 0 and str(new["date"].min()) < str(matches[-1].date)
+            if changed or earlier:
+                self.engine = TrendEngine(self.engine.window, self.engine.alpha)
+                self.rebuilds += 1
+                new = ready
+
+            for _, game in new.iterrows():
+                match = events[int(game["game_id"])]
+                summary = compute_match_patterns(match) if len(match) else None
+                self.engine.add_match(self.player, _game_aggregate(game, summary))
+
+            self._fingerprints = fingerprints
+            self._version = version
+            return self.engine
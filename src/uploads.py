@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from src.config import UPLOAD_CHUNK_BYTES, VIDEO_DIR
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256     TEXT PRIMARY KEY,
+    suffix     TEXT NOT NULL,
+    size       INTEGER NOT NULL,
+    refcount   INTEGER NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS uploads (
+    upload_id   INTEGER PRIMARY KEY AUTOINCREMENT,
+    sha256      TEXT NOT NULL REFERENCES blobs (sha256),
+    filename    TEXT NOT NULL,
+    game_id     INTEGER,
+    uploaded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_uploads_game ON uploads (game_id, upload_id);
+"""
+
+# Fichiers temporaires plus anciens que ce délai : restes d'un import interrompu
+STALE_PART_SECONDS = 3600
+
+
+@dataclass
+class UploadResult:
+    """Fichier enregistré : chemin du blob, taille, empreinte SHA-256 et débit d'écriture."""
+    path: Path
+    size: int
+    sha256: str
+    seconds: float
+    upload_id: Optional[int] = None
+    deduplicated: bool = False
+    game_id: Optional[int] = None
+
+    @property
+    def throughput(self) -> float:
+        """Débit en octets par seconde."""
+        return self.size / self.seconds if self.seconds > 0 else float("inf")
+
+
+def _write_temp(stream: BinaryIO, directory: Path, chunk_size: int) -> Tuple[Path, int, str, float]:
+    """
+    Copie un flux dans un fichier temporaire de directory par blocs de chunk_size
+    octets : la copie n'ajoute qu'un bloc en mémoire, en plus de ce que garde le flux
+    source lui-même. Taille et SHA-256 sont calculés au fil de l'écriture.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    start = time.perf_counter()
+    fd, tmp_name = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while chunk := stream.read(chunk_size):
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return Path(tmp_name), size, digest.hexdigest(), time.perf_counter() - start
+
+
+class VideoStore:
+    """
+    Stockage des vidéos adressé par contenu : chaque fichier distinct est un blob
+    blobs/<sha[:2]>/<sha><ext>, et l'index SQLite relie chaque import (nom, match) à
+    son blob. Un même fichier importé plusieurs fois n'est stocké qu'une fois
+    (compteur de références) ; gc() supprime les blobs qui ne sont plus référencés.
+    """
+
+    def __init__(self, directory: Path = VIDEO_DIR):
+        self.directory = Path(directory)
+        self.blob_dir = self.directory / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # isolation_level=None + BEGIN IMMEDIATE : index et blobs modifiés sous le même verrou
+        conn = sqlite3.connect(self.directory / "index.db", isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def blob_path(self, sha256: str, suffix: str) -> Path:
+        return self.blob_dir / sha256[:2] / f"{sha256}{suffix}"
+
+    # ── Import / suppression ───────────────────────────────────────────
+
+    def add(self, stream: BinaryIO, filename: str, game_id: Optional[int] = None,
+            chunk_size: int = UPLOAD_CHUNK_BYTES) -> UploadResult:
+        """
+        Enregistre un import. Le fichier est écrit par blocs dans un temporaire, puis
+        renommé atomiquement vers son blob ; si le blob existe déjà, le temporaire est
+        supprimé et seul le compteur de références augmente. La vidéo remplace celle
+        déjà rattachée à game_id (l'ancien import est supprimé).
+        """
+        tmp, size, sha256, seconds = _write_temp(stream, self.directory, chunk_size)
+        suffix = Path(filename).suffix.lower()
+        try:
+            with self._transaction() as conn:
+                row = conn.execute("SELECT suffix FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+                deduplicated = row is not None
+                if deduplicated:
+                    suffix = row[0]
+                    conn.execute("UPDATE blobs SET refcount = refcount + 1 WHERE sha256 = ?", (sha256,))
+                else:
+                    conn.execute("INSERT INTO blobs (sha256, suffix, size, refcount, created_at) VALUES (?, ?, ?, 1, ?)",
+                                 (sha256, suffix, size, datetime.now().isoformat(timespec="seconds")))
+                path = self.blob_path(sha256, suffix)
+                if path.exists():
+                    tmp.unlink()
+                else:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(tmp, path)
+                upload_id = conn.execute(
+                    "INSERT INTO uploads (sha256, filename, game_id, uploaded_at) VALUES (?, ?, ?, ?)",
+                    (sha256, Path(filename).name, game_id, datetime.now().isoformat(timespec="seconds")),
+                ).lastrowid
+                if game_id is not None:
+                    self._unlink_game(conn, int(game_id), keep=upload_id)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+        result = UploadResult(path, size, sha256, seconds, upload_id, deduplicated,
+                              int(game_id) if game_id is not None else None)
+        self._log_upload(result, filename)
+        return result
+
+    @staticmethod
+    def _remove(conn: sqlite3.Connection, upload_id: int) -> None:
+        row = conn.execute("SELECT sha256 FROM uploads WHERE upload_id = ?", (int(upload_id),)).fetchone()
+        if row is None:
+            return
+        conn.execute("DELETE FROM uploads WHERE upload_id = ?", (int(upload_id),))
+        conn.execute("UPDATE blobs SET refcount = refcount - 1 WHERE sha256 = ?", row)
+
+    def _unlink_game(self, conn: sqlite3.Connection, game_id: int, keep: Optional[int] = None) -> int:
+        """Supprime les imports rattachés à un match (sauf keep) ; retourne leur nombre."""
+        ids = [upload_id for (upload_id,) in conn.execute(
+            "SELECT upload_id FROM uploads WHERE game_id = ? AND upload_id IS NOT ?", (game_id, keep))]
+        for upload_id in ids:
+            self._remove(conn, upload_id)
+        return len(ids)
+
+    def remove(self, upload_id: int) -> None:
+        """Supprime un import ; son blob devient orphelin s'il n'est plus référencé."""
+        with self._transaction() as conn:
+            self._remove(conn, upload_id)
+
+    def link(self, upload_id: int, game_id: int) -> None:
+        """Rattache un import existant à un autre match, dont il remplace la vidéo."""
+        with self._transaction() as conn:
+            conn.execute("UPDATE uploads SET game_id = ? WHERE upload_id = ?", (int(game_id), int(upload_id)))
+            self._unlink_game(conn, int(game_id), keep=int(upload_id))
+
+    def unlink_game(self, game_id: int) -> int:
+        """Détache la vidéo d'un match (imports supprimés) ; retourne le nombre d'imports supprimés."""
+        with self._transaction() as conn:
+            return self._unlink_game(conn, int(game_id))
+
+    def gc(self) -> int:
+        """
+        Supprime les blobs orphelins (compteur à zéro, ou fichiers absents de l'index)
+        et les temporaires d'imports interrompus. Retourne le nombre de fichiers supprimés.
+        """
+        removed = 0
+        with self._transaction() as conn:
+            orphans = conn.execute("SELECT sha256, suffix FROM blobs WHERE refcount <= 0").fetchall()
+            for sha256, suffix in orphans:
+                self.blob_path(sha256, suffix).unlink(missing_ok=True)
+                removed += 1
+            conn.execute("DELETE FROM blobs WHERE refcount <= 0")
+
+            known = {self.blob_path(sha256, suffix) for sha256, suffix in conn.execute("SELECT sha256, suffix FROM blobs")}
+            for path in self.blob_dir.glob("*/*"):
+                if path not in known:
+                    path.unlink()
+                    removed += 1
+
+        now = time.time()
+        for path in self.directory.glob(".upload-*.part"):
+            if now - path.stat().st_mtime > STALE_PART_SECONDS:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    # ── Résolution ─────────────────────────────────────────────────────
+
+    def video_for_game(self, game_id: int) -> Optional[Path]:
+        """Blob de la dernière vidéo importée pour un match (None si aucune)."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT b.sha256, b.suffix FROM uploads u JOIN blobs b ON b.sha256 = u.sha256 "
+                "WHERE u.game_id = ? ORDER BY u.upload_id DESC LIMIT 1", (int(game_id),),
+            ).fetchone()
+        return self.blob_path(*row) if row else None
+
+    def _log_upload(self, result: UploadResult, filename: str) -> None:
+        """Journal des imports (une ligne JSON par fichier) : taille, durée et débit."""
+        entry = asdict(result)
+        # Durée nulle (très petit fichier) : débit non mesurable, None plutôt que Infinity (JSON invalide)
+        entry.update(path=str(result.path), filename=Path(filename).name,
+                     throughput=round(result.throughput, 1) if result.seconds > 0 else None,
+                     uploaded_at=datetime.now().isoformat(timespec="seconds"))
+        with open(self.directory / "uploads.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def get_video_store(directory: Path = VIDEO_DIR) -> VideoStore:
+    return VideoStore(directory)
+
+
+if __name__ == "__main__":
+    # python -m src.uploads : supprime les blobs orphelins et les imports interrompus
+    print(f"{get_video_store().gc()} fichier(s) supprimé(s)")
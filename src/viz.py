@@ -1,26 +1,31 @@
 import plotly.graph_objects as go
 
-def create_tactical_pitch(x, y, player_name, event_type, phase, sport="pickleball"):
-    fig = go.Figure()
-
+def _draw_field(fig, sport):
+    """Dessine le terrain (football) ou le court (pickleball / padel) et renvoie le préfixe du titre."""
     if sport == "football":
         # Dessin du terrain (Herbe)
-        fig.add_shape(type="rect", x0=0, y0=0, x1=100, y1=100, fillcolor="#228B22", line_color="white")
+        fig.add_shape(type="rect", x0=0, y0=0, x1=100, y1=100, fillcolor="#228B22", line_color="white", layer="below")
 
         # Lignes du terrain
-        fig.add_shape(type="line", x0=50, y0=0, x1=50, y1=100, line_color="white") # Médiane
-        fig.add_shape(type="rect", x0=82, y0=20, x1=100, y1=80, line_color="white") # Surface de réparation
+        fig.add_shape(type="line", x0=50, y0=0, x1=50, y1=100, line_color="white", layer="below") # Médiane
+        fig.add_shape(type="rect", x0=82, y0=20, x1=100, y1=80, line_color="white", layer="below") # Surface de réparation
         title_prefix = "Positionnement Tactique"
     else:
         # Dessin du court (Pickleball / Padel) — x=100 représente le filet
-        fig.add_shape(type="rect", x0=0, y0=0, x1=100, y1=100, fillcolor="#2E86AB", line_color="white")
+        fig.add_shape(type="rect", x0=0, y0=0, x1=100, y1=100, fillcolor="#2E86AB", line_color="white", layer="below")
 
         # Ligne du filet
-        fig.add_shape(type="line", x0=100, y0=0, x1=100, y1=100, line_color="white", line_width=4)
+        fig.add_shape(type="line", x0=100, y0=0, x1=100, y1=100, line_color="white", line_width=4, layer="below")
 
         # Zone non-volée (Kitchen), ~7 pieds côté filet
-        fig.add_shape(type="rect", x0=84, y0=0, x1=100, y1=100, fillcolor="rgba(255,255,255,0.12)", line_color="white")
+        fig.add_shape(type="rect", x0=84, y0=0, x1=100, y1=100, fillcolor="rgba(255,255,255,0.12)", line_color="white", layer="below")
         title_prefix = "Positionnement Tactique (Court)"
+    return title_prefix
+
+
+def create_tactical_pitch(x, y, player_name, event_type, phase, sport="pickleball"):
+    fig = go.Figure()
+    title_prefix = _draw_field(fig, sport)
 
     # Ajout d'une "Heatmap" de danger autour du point de l'action
     fig.add_trace(go.Scatter(
@@ -48,4 +53,37 @@ def create_tactical_pitch(x, y, player_name, event_type, phase, sport="picklebal
         height=500,
         showlegend=False
     )
-    return fig
\ No newline at end of file
+    return fig
+
+
+def create_heatmap(grid, event_type=None, sport="pickleball", title=None):
+    """
+    Heatmap de densité rendue depuis une HeatmapGrid (spatial_engine) : le coût
+    d'affichage dépend de la résolution de la grille, pas du nombre d'events.
+    """
+    fig = go.Figure()
+    title_prefix = _draw_field(fig, sport)
+
+    density = grid.density(event_type)
+    step = 100 / grid.bins
+    centers = [step * (i + 0.5) for i in range(grid.bins)]
+
+    fig.add_trace(go.Heatmap(
+        z=density,
+        x=centers,
+        y=centers,
+        colorscale=[[0, "rgba(255,0,0,0)"], [0.3, "rgba(255,149,0,0.45)"], [1, "rgba(255,59,48,0.85)"]],
+        showscale=False,
+        hovertemplate="x=%{x:.0f}, y=%{y:.0f}<br>%{z:.1%} des events<extra></extra>",
+        name="Densité"
+    ))
+
+    fig.update_layout(
+        title=title or f"{title_prefix} - Densité : {event_type or 'tous les events'}",
+        template="plotly_dark",
+        xaxis=dict(range=[0, 100], showgrid=False, zeroline=False, showticklabels=False),
+        yaxis=dict(range=[0, 100], showgrid=False, zeroline=False, showticklabels=False),
+        height=500,
+        showlegend=False
+    )
+    return fig
@@ -0,0 +1,29 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.analysis_engine import analyze_match_events
+from src.event_store import build_event_store
+
+
+def test_missing_values_and_thresholds_survive_the_store(tmp_path):
+    events = pd.DataFrame({
+        "match_id": [1, 1, 2],
+        "type": ["WINNER", "ERROR", "SHOT"],
+        "phase": ["kitchen", None, "service"],
+        "x": [84.6, np.nan, 100.0],
+        "y": [np.nan, 40.0, 50.0],
+        "minute": [1, np.nan, 3],
+    })
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        stored = build_event_store(events, tmp_path / "store").events()
+
+    assert stored["x"].isna().tolist() == [False, True, False]
+    assert stored["y"].isna().tolist() == [True, False, False]
+    assert stored["minute"].isna().tolist() == [False, True, False]
+    # 84.6 reste sous le seuil x_min=85 de la règle winner_filet
+    assert stored["x"].iloc[0] < 85
+    codes = analyze_match_events(stored.iloc[[0]])["explanation_codes"].iloc[0]
+    assert "winner_filet" not in codes
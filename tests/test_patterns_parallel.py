@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from src.patterns_engine import compute_patterns_for_matches, compute_patterns_parallel
+
+
+def _events(rows: int = 400, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    events = pd.DataFrame({
+        "match_id": rng.integers(1, 6, rows),
+        "type": rng.choice(["WINNER", "ERROR", "SHOT", "winner"], rows),
+        "phase": rng.choice(["service", "transition", "kitchen", "Transition", None], rows),
+        "x": rng.uniform(0, 100, rows).round(1),
+        "y": rng.uniform(0, 100, rows).round(1),
+        "minute": rng.integers(0, 60, rows),
+    })
+    # Coordonnées manquantes : comptées en fond de court, comme en passe unique
+    events.loc[rng.choice(rows, 25, replace=False), ["x", "y"]] = np.nan
+    return events
+
+
+def test_sharded_patterns_equal_single_pass(tmp_path):
+    events = _events()
+    expected = compute_patterns_for_matches(events)
+
+    # Shards mélangés : chaque match est réparti sur plusieurs shards, dont un fichier CSV
+    shuffled = events.sample(frac=1, random_state=3).reset_index(drop=True)
+    shards = [shuffled.iloc[start:start + 100] for start in range(0, len(shuffled), 100)]
+    csv_shard = tmp_path / "shard.csv"
+    shards[-1].to_csv(csv_shard, index=False)
+    assert all(len(set(shard["match_id"])) > 1 for shard in shards)
+
+    result = compute_patterns_parallel([*shards[:-1], csv_shard], max_workers=2)
+
+    assert result == expected
+
+
+def test_match_split_across_shards():
+    events = _events(rows=60)
+    match = events[events["match_id"] == events["match_id"].iloc[0]]
+    halves = [match.iloc[: len(match) // 2], match.iloc[len(match) // 2:]]
+
+    result = compute_patterns_parallel(halves, max_workers=2)
+
+    assert result == compute_patterns_for_matches(match)